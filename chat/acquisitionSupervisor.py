@@ -0,0 +1,263 @@
+# File: chat/acquisitionSupervisor.py
+# Long-lived owner of the motor and sensor monitors. Acquisition and
+# logging keep running while browser tabs close and reconnect; the
+# WebSocket consumers only attach to it.
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .constants import MOTOR_IP
+from .motorcontrol.motorCommandHandler import MotorCommandHandler
+from .motorcontrol.motorMonitor import MotorMonitor
+from .motorcontrol.socketManager import SocketManager
+from .sensorcontrol.sensorMonitor import SensorMonitor
+
+logger = logging.getLogger(__name__)
+
+MOTOR_PORT = 18385
+
+
+@dataclass
+class ComponentState:
+    running: bool = False
+    restarts: int = 0
+    started_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class AcquisitionSupervisor:
+    """Runs the monitors and restarts them with exponential backoff when they stop unexpectedly"""
+
+    def __init__(self, min_backoff=1.0, max_backoff=30.0, healthy_after=30.0):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.healthy_after = healthy_after  # a run this long resets the backoff
+        self.stop_event = asyncio.Event()
+        self.tasks = []
+
+        self.socketManager = SocketManager(MOTOR_IP, MOTOR_PORT)
+        self.commands = MotorCommandHandler(self.socketManager)
+        self.motor_monitor = MotorMonitor(
+            self.socketManager,
+            self.send_motor_value,
+            self.send_motor_frame,
+            self.stop_event
+        )
+        self.commands.use_acknowledgements(self.motor_monitor)
+        self.sensor_monitor = None  # replaced after every run, it owns the I2C buses
+        self.session_id = None  # session bound through the REST API, see bind_session
+
+        self.listeners = {"motor": set(), "sensor": set()}
+        self.components = {"motor": ComponentState(), "sensor": ComponentState()}
+
+    @property
+    def running(self):
+        return any(not task.done() for task in self.tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self.stop_event.clear()
+        if self.sensor_monitor is None:
+            self.sensor_monitor = self.create_sensor_monitor()
+        self.tasks = [
+            asyncio.create_task(self.supervise("motor", self.run_motor)),
+            asyncio.create_task(self.supervise("sensor", self.run_sensor)),
+        ]
+        logger.info("Acquisition supervisor started")
+
+    async def stop(self):
+        """Stop both monitors after writing out what they have buffered for the recording"""
+        for monitor in (self.motor_monitor, self.sensor_monitor):
+            if monitor is not None and monitor.logging_bool:
+                try:
+                    await monitor.write_buffered_data_to_db()
+                except Exception as e:
+                    logger.error(f"Error flushing recording on shutdown: {e}")
+        self.stop_event.set()
+        for task in self.tasks:
+            if not task.done():
+                try:
+                    await asyncio.wait_for(task, timeout=3.0)
+                except asyncio.TimeoutError:
+                    logger.warning("Acquisition task didn't complete within timeout, cancelling")
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
+                except Exception as e:
+                    logger.error(f"Error during acquisition shutdown: {e}")
+        self.tasks = []
+        self.socketManager.close()
+        logger.info("Acquisition supervisor stopped")
+
+    async def supervise(self, name, run):
+        state = self.components[name]
+        backoff = self.min_backoff
+        while not self.stop_event.is_set():
+            state.running = True
+            state.started_at = time.time()
+            try:
+                await run()
+                if not self.stop_event.is_set():
+                    state.last_error = "stopped unexpectedly"
+            except asyncio.CancelledError:
+                state.running = False
+                raise
+            except Exception as e:
+                state.last_error = str(e)
+                logger.error(f"Acquisition component {name} failed: {e}")
+            state.running = False
+            if self.stop_event.is_set():
+                break
+
+            if time.time() - state.started_at >= self.healthy_after:
+                backoff = self.min_backoff
+            state.restarts += 1
+            logger.warning(f"Restarting acquisition component {name} in {backoff:.1f} s")
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def run_motor(self):
+        """One motor run: (re)connect the socket, initialise the drive and poll until the listener exits"""
+        self.socketManager.close()
+        if not self.socketManager.connect():
+            raise ConnectionError(f"Cannot connect to motor at {MOTOR_IP}:{MOTOR_PORT}")
+        await self.commands.send_command([self.commands.command_dict['init_packet'][0]])
+
+        monitor = self.motor_monitor
+        pollers = [
+            asyncio.create_task(monitor.send_motor_parameter_requests(monitor.motor_values, 0.3)),
+            asyncio.create_task(monitor.send_motor_parameter_requests(monitor.motor_values_important, 0.08)),
+        ]
+        try:
+            await monitor.listen_for_motor_responses()
+        finally:
+            for task in pollers:
+                task.cancel()
+            await asyncio.gather(*pollers, return_exceptions=True)
+
+    def create_sensor_monitor(self, previous=None):
+        """A fresh SensorMonitor that keeps the logging state of the previous one"""
+        monitor = SensorMonitor(self.send_sensor_value, self.send_sensor_frame, self.stop_event)
+        if previous is not None:
+            monitor.session_id = previous.session_id
+            monitor.logging_bool = previous.logging_bool
+        elif self.session_id is not None:
+            monitor.session_id = self.session_id
+            monitor.logging_bool = True
+        return monitor
+
+    async def run_sensor(self):
+        try:
+            await self.sensor_monitor.listen_for_sensor_data()
+        finally:
+            # Its bus executors are shut down now, so the next run needs a new monitor
+            self.sensor_monitor = self.create_sensor_monitor(self.sensor_monitor)
+
+    async def bind_session(self, session_id):
+        """Record both monitors into session_id until unbind_session"""
+        self.session_id = session_id
+        for monitor in (self.motor_monitor, self.sensor_monitor):
+            if monitor is not None:
+                await monitor.bind_session(session_id)
+
+    async def unbind_session(self, session_id):
+        """Flush and detach the monitors if they record into session_id"""
+        if self.session_id == session_id:
+            self.session_id = None
+        for monitor in (self.motor_monitor, self.sensor_monitor):
+            if monitor is not None:
+                await monitor.unbind_session(session_id)
+
+    def attach(self, source, callback):
+        """Register an async callback that receives every frame of a source"""
+        self.listeners[source].add(callback)
+
+    def detach(self, source, callback):
+        self.listeners[source].discard(callback)
+
+    async def _fan_out(self, source, frame):
+        for callback in list(self.listeners[source]):
+            try:
+                await callback(frame)
+            except Exception as e:
+                logger.error(f"Error delivering {source} frame: {e}")
+
+    async def send_motor_frame(self, frame):
+        await self._fan_out("motor", frame)
+
+    async def send_sensor_frame(self, frame):
+        await self._fan_out("sensor", frame)
+
+    async def send_motor_value(self, key, value):
+        await get_channel_layer().group_send('motor_control', {'type': 'motor_value', 'key': key, 'value': value})
+
+    async def send_sensor_value(self, key, value):
+        await get_channel_layer().group_send('sensor_control', {'type': 'sensor_value', 'key': key, 'value': value})
+
+    def get_status(self):
+        return {
+            "running": self.running,
+            "session_id": self.session_id,
+            "components": {name: asdict(state) for name, state in self.components.items()},
+            "listeners": {source: len(callbacks) for source, callbacks in self.listeners.items()},
+        }
+
+
+_supervisor = None
+
+
+def get_acquisition_supervisor():
+    """The process-wide supervisor, created on first use"""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = AcquisitionSupervisor()
+    return _supervisor
+
+
+async def ensure_acquisition_started():
+    supervisor = get_acquisition_supervisor()
+    supervisor.start()
+    return supervisor
+
+
+def bind_recording_session(session_id):
+    """Called from the session views; runs on the server's event loop under ASGI"""
+    async_to_sync(get_acquisition_supervisor().bind_session)(session_id)
+
+
+def unbind_recording_session(session_id):
+    async_to_sync(get_acquisition_supervisor().unbind_session)(session_id)
+
+
+class AcquisitionLifespan:
+    """ASGI lifespan handler: starts acquisition with the server (if ACQUISITION_AUTOSTART) and stops it on shutdown.
+
+    Servers without lifespan support (e.g. runserver/daphne) never call this;
+    acquisition then starts with the first consumer that attaches.
+    """
+
+    async def __call__(self, scope, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if getattr(settings, "ACQUISITION_AUTOSTART", False):
+                    await ensure_acquisition_started()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if _supervisor is not None:
+                    await _supervisor.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,50 @@
+# File: chat/activeSessions.py
+# In-process cache of each user's active session id.
+#
+# Views and monitors ask for a user's active session on every start, poll
+# and logging toggle. Entries are dropped whenever a session of the user
+# is saved or deleted in this process; the TTL bounds how long a change
+# made by another process (e.g. run_acquisition) can go unnoticed.
+
+import time
+
+from django.db import transaction
+
+from .models import ProtoSession
+
+ACTIVE_SESSION_TTL = 5.0  # seconds
+
+_active_sessions = {}  # user_id -> (session_id or None, expires at)
+
+
+def get_active_session_id(user_id):
+    """Primary key of the user's active session, or None"""
+    entry = _active_sessions.get(user_id)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    session_id = ProtoSession.objects.filter(user_id=user_id, is_active=True).values_list("id", flat=True).first()
+    _active_sessions[user_id] = (session_id, time.monotonic() + ACTIVE_SESSION_TTL)
+    return session_id
+
+
+def get_active_session(user_id):
+    """The user's active ProtoSession, or None"""
+    session_id = get_active_session_id(user_id)
+    if session_id is None:
+        return None
+    # is_active is checked again, so a stale entry can never return a closed session
+    session = ProtoSession.objects.filter(id=session_id, is_active=True).first()
+    if session is None:
+        invalidate_active_session(user_id)
+        return ProtoSession.objects.filter(user_id=user_id, is_active=True).first()
+    return session
+
+
+def invalidate_active_session(user_id):
+    _active_sessions.pop(user_id, None)
+
+
+def session_changed(sender, instance, **kwargs):
+    invalidate_active_session(instance.user_id)
+    # Again after commit, in case a lookup cached the old state in between
+    transaction.on_commit(lambda: invalidate_active_session(instance.user_id))
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chat'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import BaseUser, ProtoSession
+        from .activeSessions import session_changed
+        from .cachedAuthentication import user_changed
+        from .sessionDataCache import session_deleted, session_saved
+
+        post_save.connect(session_saved, sender=ProtoSession, dispatch_uid="session_data_cache_saved")
+        post_delete.connect(session_deleted, sender=ProtoSession, dispatch_uid="session_data_cache_deleted")
+        post_save.connect(session_changed, sender=ProtoSession, dispatch_uid="active_session_saved")
+        post_delete.connect(session_changed, sender=ProtoSession, dispatch_uid="active_session_deleted")
+        post_save.connect(user_changed, sender=BaseUser, dispatch_uid="token_user_saved")
+        post_delete.connect(user_changed, sender=BaseUser, dispatch_uid="token_user_deleted")
@@ -0,0 +1,90 @@
+# File: chat/cachedAuthentication.py
+# JWT authentication that remembers validated tokens and their users.
+#
+# JWTAuthentication checks the token signature and loads the BaseUser from
+# the database on every request; the history page sends bursts of them.
+# Here each raw access token is validated once and its user kept in a
+# bounded LRU until the token expires (at most JWT_USER_CACHE_TTL). Saving
+# or deleting a user drops its entries in this process; the TTL bounds how
+# long other processes keep serving an updated user.
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class TokenUserCache:
+    """LRU of raw token -> (user, validated token, expires at)"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.entries.get(raw_token)
+            if entry is None or entry[2] <= time.time():
+                if entry is not None:
+                    del self.entries[raw_token]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(raw_token)
+            self.hits += 1
+            return entry
+
+    def put(self, raw_token, user, validated_token):
+        expires = min(validated_token["exp"], time.time() + self.ttl)
+        with self.lock:
+            self.entries[raw_token] = (user, validated_token, expires)
+            self.entries.move_to_end(raw_token)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            for raw_token in [token for token, entry in self.entries.items() if entry[0].pk == user_id]:
+                del self.entries[raw_token]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_user_cache = TokenUserCache(
+    max_size=getattr(settings, "JWT_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "JWT_USER_CACHE_TTL", 300),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        entry = token_user_cache.get(raw_token)
+        if entry is not None:
+            user, validated_token, _ = entry
+            # A copy, so one request can't change the user another request sees
+            return copy.copy(user), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        token_user_cache.put(raw_token, copy.copy(user), validated_token)
+        return user, validated_token
+
+
+def user_changed(sender, instance, **kwargs):
+    token_user_cache.invalidate_user(instance.pk)
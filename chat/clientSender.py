@@ -0,0 +1,121 @@
+# File: chat/clientSender.py
+# Per-connection outbound queue for the WebSocket consumers.
+#
+# Telemetry frames are conflated: only the newest unsent frame per key is
+# kept, so a slow client just receives fewer frames. Control messages
+# (command status, logging status, errors) are queued in order. All actual
+# socket writes happen in the sender's own task, so the acquisition loops
+# never wait on a client.
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+
+logger = logging.getLogger(__name__)
+
+
+def parse_max_rate(value):
+    """Frames per second from a client message or query string; None or "" = as produced"""
+    if value is None or value == "":
+        return None
+    try:
+        max_rate = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"max_rate must be a number, got {value!r}")
+    if not math.isfinite(max_rate) or max_rate <= 0:
+        raise ValueError(f"max_rate must be a positive number, got {value!r}")
+    return max_rate
+
+
+@dataclass
+class ClientSenderStats:
+    frames_sent: int = 0
+    frames_conflated: int = 0
+    messages_sent: int = 0
+    messages_dropped: int = 0
+    max_send_ms: float = 0.0
+
+
+class ClientSender:
+    def __init__(self, send_text_callback, max_rate=None, max_messages=256):
+        self.send_text = send_text_callback
+        self.min_frame_interval = 0.0
+        self.set_max_rate(max_rate)
+        self.messages = deque(maxlen=max_messages)
+        self.frames = {}  # key -> newest unsent frame
+        self.stats = ClientSenderStats()
+        self.last_frame_time = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def set_max_rate(self, max_rate):
+        """Limit telemetry frames to max_rate per second (None = as produced); raises ValueError on bad rates"""
+        self.max_rate = parse_max_rate(max_rate)
+        self.min_frame_interval = 1.0 / self.max_rate if self.max_rate else 0.0
+
+    def send_frame(self, frame, key="default"):
+        """Queue a telemetry frame, replacing an unsent older frame with the same key"""
+        if key in self.frames:
+            self.stats.frames_conflated += 1
+        self.frames[key] = frame
+        self._wakeup.set()
+
+    def send_message(self, message):
+        """Queue a control message; these are never conflated"""
+        if len(self.messages) == self.messages.maxlen:
+            self.stats.messages_dropped += 1
+        self.messages.append(message)
+        self._wakeup.set()
+
+    def get_stats(self):
+        return {**asdict(self.stats), "max_rate": self.max_rate}
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _send(self, message):
+        started = time.perf_counter()
+        await self.send_text(json.dumps(message))
+        self.stats.max_send_ms = max(self.stats.max_send_ms, (time.perf_counter() - started) * 1000)
+
+    async def _run(self):
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                while self.messages:
+                    await self._send(self.messages.popleft())
+                    self.stats.messages_sent += 1
+
+                if not self.frames:
+                    continue
+
+                # Respect the client's max rate; newer frames keep replacing the pending one meanwhile
+                wait = self.last_frame_time + self.min_frame_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    self._wakeup.set()
+                    continue
+
+                frames, self.frames = self.frames, {}
+                for frame in frames.values():
+                    await self._send(frame)
+                    self.stats.frames_sent += 1
+                self.last_frame_time = time.monotonic()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Client sender stopped: {e}")
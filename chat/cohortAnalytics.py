@@ -0,0 +1,120 @@
+# File: chat/cohortAnalytics.py
+# Session metrics aggregated over cohorts of users, e.g. wheelchair users over 60.
+#
+# Users are selected by their anthropometric fields and the SessionSummary
+# rows of their sessions are aggregated in one grouped query; nothing is
+# loaded per user or per session, and raw telemetry is never read here.
+# Finished sessions without a summary (see sessionAnalytics.py) are left
+# out until backfill_summaries has run.
+
+from datetime import date
+
+from django.db.models import Avg, Case, CharField, Count, F, Max, Value, When
+
+from .models import BaseUser, SessionSummary
+
+# Query parameter -> BaseUser lookup of numeric range filters
+RANGE_FILTERS = {
+    "height_min": "height__gte",
+    "height_max": "height__lte",
+    "gewicht_min": "gewicht__gte",
+    "gewicht_max": "gewicht__lte",
+    "oberschenkellänge_min": "oberschenkellänge__gte",
+    "oberschenkellänge_max": "oberschenkellänge__lte",
+    "unterschenkel_min": "unterschenkel__gte",
+    "unterschenkel_max": "unterschenkel__lte",
+}
+
+GROUPINGS = ("geschlecht", "rollstuhl", "age_band")
+
+AGE_BAND_YEARS = 10
+AGE_BAND_LIMIT = 90  # last band is "90+"
+
+AGGREGATES = {
+    "users": Count("session__user", distinct=True),
+    "sessions": Count("session"),
+    "duration_avg": Avg("duration"),
+    "peak_force_A2_avg": Avg("peak_force_A2"),
+    "peak_force_A2_max": Max("peak_force_A2"),
+    "peak_force_A3_avg": Avg("peak_force_A3"),
+    "peak_force_A3_max": Max("peak_force_A3"),
+    "position_min_avg": Avg("position_min"),
+    "position_max_avg": Avg("position_max"),
+    "mean_velocity_avg": Avg("mean_velocity"),
+}
+
+
+def years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # Feb 29
+        return day.replace(year=day.year - years, day=28)
+
+
+def age_filters(age_min=None, age_max=None, today=None):
+    """geburtsdatum lookups for an age range in whole years"""
+    today = today or date.today()
+    lookups = {}
+    if age_min is not None:
+        lookups["geburtsdatum__lte"] = years_before(today, age_min)
+    if age_max is not None:
+        # Still age_max until the day before the (age_max + 1)th birthday
+        lookups["geburtsdatum__gt"] = years_before(today, age_max + 1)
+    return lookups
+
+
+def age_band(field="session__user__geburtsdatum", today=None):
+    """Case expression mapping a birth date to "0-9", "10-19", ..., "90+" """
+    today = today or date.today()
+    whens = []
+    for lower in range(0, AGE_BAND_LIMIT, AGE_BAND_YEARS):
+        upper = lower + AGE_BAND_YEARS
+        whens.append(When(**{f"{field}__gt": years_before(today, upper)}, then=Value(f"{lower}-{upper - 1}")))
+    whens.append(When(**{f"{field}__isnull": False}, then=Value(f"{AGE_BAND_LIMIT}+")))
+    return Case(*whens, default=Value(None), output_field=CharField())
+
+
+def parse_user_filters(params):
+    """BaseUser lookups from query parameters like ?rollstuhl=true&age_min=60; raises ValueError on bad values"""
+    filters = {}
+    try:
+        for name, lookup in RANGE_FILTERS.items():
+            if params.get(name):
+                filters[lookup] = float(params[name])
+        age_min = int(params["age_min"]) if params.get("age_min") else None
+        age_max = int(params["age_max"]) if params.get("age_max") else None
+        if params.get("age"):  # exact age in whole years
+            age_min = age_max = int(params["age"])
+    except ValueError:
+        raise ValueError("Range filters must be numbers")
+    filters.update(age_filters(age_min, age_max))
+
+    geschlecht = params.get("geschlecht")
+    if geschlecht:
+        if geschlecht not in BaseUser.Genders.values:
+            raise ValueError(f"geschlecht must be one of {', '.join(BaseUser.Genders.values)}")
+        filters["geschlecht"] = geschlecht
+    rollstuhl = params.get("rollstuhl")
+    if rollstuhl:
+        if rollstuhl.lower() not in ("true", "false"):
+            raise ValueError("rollstuhl must be true or false")
+        filters["rollstuhl"] = rollstuhl.lower() == "true"
+    return filters
+
+
+def cohort_users(filters):
+    """BaseUser queryset of a cohort; filters are BaseUser lookups"""
+    return BaseUser.objects.filter(**filters)
+
+
+def cohort_metrics(filters, group_by=None):
+    """Aggregated SessionSummary metrics of the cohort's finished sessions, per group_by value"""
+    users = cohort_users(filters)
+    summaries = SessionSummary.objects.filter(session__user__in=users, session__is_active=False)
+    if group_by == "age_band":
+        rows = summaries.annotate(group=age_band()).values("group")
+    elif group_by:
+        rows = summaries.values(group=F(f"session__user__{group_by}"))
+    else:
+        return [summaries.aggregate(**AGGREGATES)]
+    return list(rows.annotate(**AGGREGATES).order_by("group"))
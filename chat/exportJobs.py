@@ -0,0 +1,269 @@
+# File: chat/exportJobs.py
+# Background export of session telemetry to CSV or Parquet.
+#
+# The export views only create an ExportJob row and put its id on an
+# in-process queue; a single worker thread writes the files, so no ASGI
+# worker waits on an export and no external broker is needed. Rows are
+# streamed with iterator(), which uses server-side cursors on PostgreSQL.
+# A job produces one zip archive with one file per source (motor.csv,
+# sensor.csv or .parquet), each holding the rows of all its sessions.
+# Several processes may run a worker; a claimed job records its worker
+# and a heartbeat, and only jobs whose heartbeat went stale are failed.
+# Archives are deleted EXPORT_RETENTION_DAYS after their job finished.
+
+import csv
+import io
+import logging
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import ExportJob, ProtoData, ProtoSession, SensorData
+from .partitioning import session_window
+
+# Try to import pyarrow, Parquet exports are unavailable without it
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_SOURCES = {
+    "motor": (ProtoData, ("actual_position", "actual_velocity", "phase_current", "voltage_logic")),
+    "sensor": (SensorData, ("nodes", "gewicht_A2", "touchstatus_A2", "griffhoehe_A2",
+                            "gewicht_A3", "touchstatus_A3", "griffhoehe_A3")),
+}
+
+CHUNK_SIZE = 5000            # rows per server-side cursor fetch
+PARQUET_ROW_GROUP = 100000   # rows per Parquet row group
+HEARTBEAT_INTERVAL = 30      # seconds between heartbeats of the running job
+
+if PYARROW_AVAILABLE:
+    PARQUET_TYPES = {
+        "session_id": pa.int64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "actual_position": pa.int32(),
+        "actual_velocity": pa.int32(),
+        "phase_current": pa.int32(),
+        "voltage_logic": pa.int32(),
+        "nodes": pa.int16(),
+        "touchstatus_A2": pa.int16(),
+        "touchstatus_A3": pa.int16(),
+        "gewicht_A2": pa.float32(),
+        "griffhoehe_A2": pa.float32(),
+        "gewicht_A3": pa.float32(),
+        "griffhoehe_A3": pa.float32(),
+    }
+
+
+def export_rows(source, sessions):
+    """(header, row iterator) of a source over the given sessions, in session and time order"""
+    model, columns = EXPORT_SOURCES[source]
+    header = ("session_id", "timestamp", *columns)
+
+    def rows():
+        for session in sessions:
+            data = model.objects.filter(session=session, **session_window(session)).order_by("timestamp")
+            for row in data.values_list("timestamp", *columns).iterator(chunk_size=CHUNK_SIZE):
+                yield (session.id, *row)
+
+    return header, rows()
+
+
+def write_csv(archive, name, header, rows):
+    count = 0
+    with archive.open(name, "w", force_zip64=True) as member:
+        text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        text.flush()
+        text.detach()
+    return count
+
+
+def write_parquet(archive, name, header, rows, workdir):
+    schema = pa.schema([(column, PARQUET_TYPES[column]) for column in header])
+    path = os.path.join(workdir, name)
+    count = 0
+
+    def to_table(batch):
+        columns = zip(*batch)
+        return pa.Table.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                                    schema=schema)
+
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == PARQUET_ROW_GROUP:
+                writer.write_table(to_table(batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(to_table(batch))
+            count += len(batch)
+    # Parquet is already compressed
+    archive.write(path, name, compress_type=zipfile.ZIP_STORED)
+    os.remove(path)
+    return count
+
+
+def run_export(job):
+    """Write the archive of a job, returns (path, rows)"""
+    sessions = list(ProtoSession.objects.filter(id__in=job.session_ids, user_id=job.user_id).order_by("start_time"))
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.EXPORT_DIR, f"export_{job.id}.zip")
+    partial = f"{path}.part"
+    total = 0
+    try:
+        with tempfile.TemporaryDirectory(dir=settings.EXPORT_DIR) as workdir:
+            with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for source in job.sources:
+                    header, rows = export_rows(source, sessions)
+                    if job.format == ExportJob.Format.PARQUET:
+                        total += write_parquet(archive, f"{source}.parquet", header, rows, workdir)
+                    else:
+                        total += write_csv(archive, f"{source}.csv", header, rows)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return path, total
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def purge_old_exports():
+    """Delete the archives of jobs that finished more than EXPORT_RETENTION_DAYS ago"""
+    finished_before = timezone.now() - timedelta(days=settings.EXPORT_RETENTION_DAYS)
+    old = ExportJob.objects.filter(status__in=[ExportJob.Status.DONE, ExportJob.Status.FAILED],
+                                   finished_at__lt=finished_before).exclude(file_path="")
+    purged = 0
+    for job_id, file_path in old.values_list("id", "file_path"):
+        remove_file(file_path)
+        # The job stays for its history; downloads answer 410 Gone
+        ExportJob.objects.filter(id=job_id).update(file_path="")
+        purged += 1
+    if purged:
+        logger.info(f"Deleted {purged} export archive(s) older than {settings.EXPORT_RETENTION_DAYS} days")
+    return purged
+
+
+def recover_stale_jobs():
+    """Fail running jobs whose worker stopped sending heartbeats, e.g. because its process died"""
+    stale_before = timezone.now() - timedelta(seconds=settings.EXPORT_STALE_AFTER)
+    failed = ExportJob.objects.filter(status=ExportJob.Status.RUNNING, heartbeat_at__lt=stale_before).update(
+        status=ExportJob.Status.FAILED, error="Export worker stopped responding", finished_at=timezone.now())
+    if failed:
+        logger.warning(f"Failed {failed} export job(s) with a stale heartbeat")
+    return failed
+
+
+class ExportWorker:
+    """Runs export jobs one at a time on a daemon thread"""
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.current = None  # id of the job being written
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            recover_stale_jobs()
+            purge_old_exports()
+            # Pending jobs may also be queued by another process; the claim in process() runs each once
+            for job_id in ExportJob.objects.filter(status=ExportJob.Status.PENDING).values_list("id", flat=True):
+                self.jobs.put(job_id)
+            self.thread = threading.Thread(target=self.run, name="export-worker", daemon=True)
+            self.thread.start()
+            threading.Thread(target=self.beat, name="export-heartbeat", daemon=True).start()
+
+    def submit(self, job):
+        self.start()
+        self.jobs.put(job.id)
+
+    def run(self):
+        while True:
+            job_id = self.jobs.get()
+            try:
+                self.process(job_id)
+            except Exception as e:
+                logger.error(f"Export worker error on job {job_id}: {e}")
+            finally:
+                # The thread outlives requests, so nothing else closes its connection
+                close_old_connections()
+
+    def beat(self):
+        """Refresh the heartbeat of the running job and fail the stale jobs of dead workers"""
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            try:
+                job_id = self.current
+                if job_id is not None:
+                    ExportJob.objects.filter(id=job_id, worker=self.name, status=ExportJob.Status.RUNNING).update(
+                        heartbeat_at=timezone.now())
+                recover_stale_jobs()
+            except Exception as e:
+                logger.error(f"Export heartbeat error: {e}")
+            finally:
+                close_old_connections()
+
+    def process(self, job_id):
+        # Claim the job; another process or the pending scan may already have picked it up
+        if not ExportJob.objects.filter(id=job_id, status=ExportJob.Status.PENDING).update(
+                status=ExportJob.Status.RUNNING, worker=self.name, heartbeat_at=timezone.now()):
+            return
+        self.current = job_id
+        job = ExportJob.objects.get(id=job_id)
+        logger.info(f"Export job {job.id}: {job.format} of sessions {job.session_ids}")
+        fields = {}
+        try:
+            fields["file_path"], fields["rows"] = run_export(job)
+            fields["status"] = ExportJob.Status.DONE
+        except Exception as e:
+            logger.error(f"Export job {job.id} failed: {e}")
+            fields.update(status=ExportJob.Status.FAILED, error=str(e))
+        finally:
+            self.current = None
+        fields["finished_at"] = timezone.now()
+        # Only finish the job if it wasn't failed as stale in the meantime
+        if not ExportJob.objects.filter(id=job_id, worker=self.name, status=ExportJob.Status.RUNNING).update(**fields):
+            logger.warning(f"Export job {job_id} was failed as stale while running, discarding its archive")
+            if fields.get("file_path"):
+                remove_file(fields["file_path"])
+
+
+_worker = None
+
+
+def get_export_worker():
+    """The process-wide export worker, created on first use"""
+    global _worker
+    if _worker is None:
+        _worker = ExportWorker()
+    return _worker
@@ -0,0 +1,34 @@
+# File: chat/management/commands/backfill_rollups.py
+# Rollups of sessions recorded before rollups existed (run it once after deploying them).
+#
+# Only ended sessions are backfilled: the monitors keep the rollups of a
+# recording session up to date, and a rebuild would race their updates.
+
+from django.core.management.base import BaseCommand
+
+from chat.models import ProtoSession, TelemetryRollup
+from chat.telemetryRollups import RAW_MODELS, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Compute the telemetry rollups of ended sessions that have none"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", type=int, action="append", dest="sessions",
+                            help="Only this session (repeatable); rebuilds even if it has rollups")
+
+    def handle(self, *args, **options):
+        sessions = ProtoSession.objects.filter(is_active=False, end_time__isnull=False)
+        if options["sessions"]:
+            sessions = sessions.filter(id__in=options["sessions"])
+
+        rebuilt = 0
+        for session_id in sessions.order_by("id").values_list("id", flat=True):
+            for source, model in RAW_MODELS.items():
+                if not options["sessions"] and TelemetryRollup.objects.filter(session_id=session_id, source=source).exists():
+                    continue
+                if not model.objects.filter(session_id=session_id).exists():
+                    continue
+                rebuild_rollups(session_id, source)
+                rebuilt += 1
+        self.stdout.write(f"Rebuilt {rebuilt} rollup(s)")
@@ -0,0 +1,26 @@
+# File: chat/management/commands/backfill_summaries.py
+# SessionSummary rows of finished sessions that have none (run it once after deploying them).
+#
+# Sessions stopped through the stop views or closed by starting a new one
+# are summarized right away; this covers sessions that ended before that,
+# which cohort metrics leave out until they have a summary.
+
+from django.core.management.base import BaseCommand
+
+from chat.models import ProtoSession
+from chat.sessionAnalytics import SESSION_BATCH, summarize_sessions
+
+
+class Command(BaseCommand):
+    help = "Compute the SessionSummary of finished sessions that have none"
+
+    def handle(self, *args, **options):
+        sessions = ProtoSession.objects.filter(is_active=False, end_time__isnull=False, summary__isnull=True)
+        total = 0
+        while True:
+            batch = list(sessions.order_by("id")[:SESSION_BATCH])
+            if not batch:
+                break
+            summarize_sessions(batch)
+            total += len(batch)
+        self.stdout.write(f"Summarized {total} session(s)")
@@ -0,0 +1,48 @@
+# File: chat/management/commands/bench_auth.py
+# Authenticated request throughput with and without the token/user cache.
+#
+# Sends --requests GETs with the same access token to a hot endpoint, as
+# the history page does in bursts, once through JWTAuthentication and once
+# through CachedJWTAuthentication.
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from chat.cachedAuthentication import CachedJWTAuthentication, token_user_cache
+from chat.models import BaseUser
+from chat.views import GetUserView
+
+BENCH_USERNAME = "bench_auth"
+
+
+class Command(BaseCommand):
+    help = "Measure authenticated requests/s with JWTAuthentication vs CachedJWTAuthentication"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per authentication class")
+
+    def handle(self, *args, **options):
+        user, _ = BaseUser.objects.get_or_create(username=BENCH_USERNAME)
+        token = str(AccessToken.for_user(user))
+        factory = APIRequestFactory()
+        try:
+            for authentication in (JWTAuthentication, CachedJWTAuthentication):
+                token_user_cache.clear()
+                view = GetUserView.as_view(authentication_classes=[authentication])
+                with CaptureQueriesContext(connection) as queries:
+                    began = time.perf_counter()
+                    for _ in range(options["requests"]):
+                        response = view(factory.get("/get_current_user", HTTP_AUTHORIZATION=f"Bearer {token}"))
+                        response.render()
+                    elapsed = time.perf_counter() - began
+                assert response.status_code == 200, response.data
+                self.stdout.write(f"{authentication.__name__:24} {options['requests'] / elapsed:8,.0f} requests/s  "
+                                  f"{len(queries) / options['requests']:.2f} queries/request")
+        finally:
+            user.delete()
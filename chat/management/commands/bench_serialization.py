@@ -0,0 +1,89 @@
+# File: chat/management/commands/bench_serialization.py
+# Fetch and encode time of a session's telemetry per response format.
+#
+# Compares the DRF serializer path the session data views used to take with
+# the values_list/orjson paths of chat/telemetryJson.py, on one synthetic
+# session of --rows rows per table.
+
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from chat.models import BaseUser, ProtoData, ProtoSession, SensorData
+from chat.serialziers import ProtoDataSerializer
+from chat.telemetryJson import ORJSON_AVAILABLE, columnar, dumps
+
+from .bench_telemetry import BENCH_USERNAME, make_motor_rows, make_sensor_rows
+
+MOTOR_COLUMNS = ["actual_position", "actual_velocity", "phase_current", "voltage_logic"]
+SENSOR_COLUMNS = ["nodes", "gewicht_A2", "touchstatus_A2", "griffhoehe_A2",
+                  "gewicht_A3", "touchstatus_A3", "griffhoehe_A3"]
+
+
+def motor_variants(queryset):
+    return {
+        "serializer": (lambda: ProtoDataSerializer(queryset.all(), many=True).data,
+                       lambda data: JSONRenderer().render(data)),
+        "rows": (lambda: list(queryset.values(*MOTOR_COLUMNS, "timestamp")), dumps),
+        "columns": (lambda: columnar(queryset, MOTOR_COLUMNS), dumps),
+    }
+
+
+def sensor_variants(queryset):
+    def instance_dicts():
+        # What the sensor view did before it switched to values()
+        return [{"id": row.id, "timestamp": row.timestamp,
+                 **{column: getattr(row, column) for column in SENSOR_COLUMNS}} for row in queryset.all()]
+
+    return {
+        "instances": (instance_dicts, lambda data: JSONRenderer().render(data)),
+        "rows": (lambda: list(queryset.values("id", "timestamp", *SENSOR_COLUMNS)), dumps),
+        "columns": (lambda: columnar(queryset, SENSOR_COLUMNS), dumps),
+    }
+
+
+class Command(BaseCommand):
+    help = "Measure fetch and JSON encode time of a session's telemetry for each response format"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="Rows per table in the benchmark session")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per format, the median is reported")
+
+    def handle(self, *args, **options):
+        user, _ = BaseUser.objects.get_or_create(username=BENCH_USERNAME)
+        # bulk_create skips ProtoSession.save(), which would close the user's active session
+        ProtoSession.objects.bulk_create([ProtoSession(user=user, is_active=False)])
+        session = ProtoSession.objects.filter(user=user).order_by("-id").first()
+        self.stdout.write(f"orjson: {'yes' if ORJSON_AVAILABLE else 'no, stdlib json'}, {options['rows']} rows")
+        try:
+            start = datetime.now(timezone.utc) - timedelta(seconds=options["rows"] * 0.1)
+            for model, make_rows in ((ProtoData, make_motor_rows), (SensorData, make_sensor_rows)):
+                rows = make_rows(session, start, options["rows"])
+                for i, row in enumerate(rows):
+                    row.timestamp = start + timedelta(seconds=i * 0.1)
+                model.objects.bulk_create(rows, batch_size=5000)
+
+            motor = ProtoData.objects.filter(session=session).order_by("timestamp")
+            sensor = SensorData.objects.filter(session=session).order_by("timestamp")
+            for name, variants in (("motor", motor_variants(motor)), ("sensor", sensor_variants(sensor))):
+                for variant, (fetch, encode) in variants.items():
+                    self.bench(f"{name}/{variant}", fetch, encode, options["repeat"])
+        finally:
+            session.delete()
+
+    def bench(self, label, fetch, encode, repeat):
+        fetch_ms, encode_ms = [], []
+        size = 0
+        for _ in range(repeat):
+            began = time.perf_counter()
+            data = fetch()
+            fetched = time.perf_counter()
+            size = len(encode(data))
+            fetch_ms.append((fetched - began) * 1000)
+            encode_ms.append((time.perf_counter() - fetched) * 1000)
+        fetch_median, encode_median = statistics.median(fetch_ms), statistics.median(encode_ms)
+        self.stdout.write(f"{label:18} fetch {fetch_median:8.1f} ms  encode {encode_median:8.1f} ms  "
+                          f"total {fetch_median + encode_median:8.1f} ms  {size / 1e6:6.2f} MB")
@@ -0,0 +1,195 @@
+# File: chat/management/commands/bench_telemetry.py
+# Insert throughput, storage cost per row and session read latency of the telemetry tables.
+#
+# Writes synthetic rows the way the monitors do (bulk_create batches in a
+# transaction) into throwaway sessions, then reads whole sessions in time
+# order like the session data views. Run it before and after a schema or
+# index migration to compare, e.g. `migrate chat 0005` vs `migrate chat 0006`:
+# rows are built with the models of the migrations applied to the database,
+# not with chat.models, so older schemas can be measured too.
+
+import math
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from chat.models import BaseUser, ProtoSession
+
+BENCH_USERNAME = "bench_telemetry"
+SAMPLE_PERIOD = 0.1  # seconds between the rows of a session
+
+
+def relation_size(table):
+    """Bytes used by a table including its indexes and partitions, or None if the backend can't tell"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("""
+                SELECT coalesce(sum(pg_total_relation_size(relid)), 0)
+                FROM pg_partition_tree(%s::regclass)
+            """, [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute("""
+                    SELECT sum(pgsize) FROM dbstat
+                    WHERE name = %s OR name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s AND type = 'index')
+                """, [table, table])
+                return cursor.fetchone()[0] or 0
+            except Exception:
+                return None
+    return None
+
+
+def tuple_size(model, session):
+    """Average on-disk size of one row without indexes (PostgreSQL only)"""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT avg(pg_column_size(t.*)) FROM {model._meta.db_table} t WHERE session_id = %s",
+                       [session.id])
+        return cursor.fetchone()[0]
+
+
+def applied_model(name):
+    """chat model as of the latest chat migration applied to the database"""
+    loader = MigrationExecutor(connection).loader
+    applied = [key for key in loader.applied_migrations if key[0] == "chat"]
+    return loader.project_state(max(applied, key=lambda key: key[1]), at_end=True).apps.get_model("chat", name)
+
+
+def make_sensor_rows(model, session, start, count):
+    field_names = {f.name for f in model._meta.fields}
+    schema_fields = {}
+    if "nodes" in field_names:
+        schema_fields["nodes"] = (1 << 2) | (1 << 3)
+    if "sensor_id" in field_names:  # before 0006
+        schema_fields["sensor_id"] = "both"
+    rows = []
+    for i in range(count):
+        phase = i / 200
+        rows.append(model(
+            session_id=session.id,
+            timestamp=start + timedelta(seconds=i * SAMPLE_PERIOD),
+            gewicht_A2=round(200 + 50 * math.sin(phase) + random.random(), 2),
+            touchstatus_A2=random.getrandbits(12),
+            griffhoehe_A2=round(80 + random.random(), 1),
+            gewicht_A3=round(200 + 50 * math.cos(phase) + random.random(), 2),
+            touchstatus_A3=random.getrandbits(12),
+            griffhoehe_A3=round(80 + random.random(), 1),
+            **schema_fields,
+        ))
+    return rows
+
+
+def make_motor_rows(model, session, start, count):
+    return [model(
+        session_id=session.id,
+        timestamp=start + timedelta(seconds=i * SAMPLE_PERIOD),
+        actual_position=random.randint(0, 1000),
+        actual_velocity=random.randint(-3000, 3000),
+        phase_current=random.randint(-2000, 2000),
+        voltage_logic=24000,
+    ) for i in range(count)]
+
+
+TABLES = {
+    "sensor": ("SensorData", make_sensor_rows),
+    "motor": ("ProtoData", make_motor_rows),
+}
+
+
+def session_query(model, session_id):
+    """All values of a session in time order, as served by the session data views"""
+    columns = [f.attname for f in model._meta.concrete_fields if f.name not in ("id", "session")]
+    return model.objects.filter(session_id=session_id).order_by("timestamp").values_list(*columns)
+
+
+def query_plan(queryset):
+    """First line of the PostgreSQL plan, e.g. 'Index Only Scan using ...'"""
+    if connection.vendor != "postgresql":
+        return None
+    plan = queryset.explain()
+    return plan.splitlines()[0].strip() if plan else None
+
+
+class Command(BaseCommand):
+    help = "Measure insert rows/s, bytes/row and session read latency of the telemetry tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000, help="Rows per table, e.g. 10000000")
+        parser.add_argument("--batch", type=int, default=500, help="Rows per bulk_create, as in the monitors")
+        parser.add_argument("--session-rows", type=int, default=36000,
+                            help="Rows per benchmark session (36000 = one hour of sensor data)")
+        parser.add_argument("--reads", type=int, default=5, help="Sessions read back per table")
+        parser.add_argument("--table", choices=sorted(TABLES), action="append",
+                            help="Table(s) to benchmark, default all")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark sessions and their rows")
+
+    def handle(self, *args, **options):
+        user, _ = BaseUser.objects.get_or_create(username=BENCH_USERNAME)
+        session_count = max(1, math.ceil(options["rows"] / options["session_rows"]))
+        # bulk_create skips ProtoSession.save(), which would close the previous session on every insert
+        sessions = ProtoSession.objects.bulk_create(
+            [ProtoSession(user=user, is_active=False) for _ in range(session_count)])
+        if not sessions[0].pk:
+            sessions = list(ProtoSession.objects.filter(user=user).order_by("-id")[:session_count])[::-1]
+        self.stdout.write(f"Database: {connection.vendor}, {session_count} sessions")
+        try:
+            for name in options["table"] or sorted(TABLES):
+                model_name, make_rows = TABLES[name]
+                model = applied_model(model_name)
+                self.bench_inserts(name, model, make_rows, sessions, options)
+                self.bench_reads(name, model, sessions, options["reads"])
+        finally:
+            if not options["keep"]:
+                ProtoSession.objects.filter(id__in=[session.id for session in sessions]).delete()
+
+    def bench_inserts(self, name, model, make_rows, sessions, options):
+        table = model._meta.db_table
+        total, batch, session_rows = options["rows"], options["batch"], options["session_rows"]
+        size_before = relation_size(table)
+        start = datetime.now(timezone.utc)
+
+        elapsed = 0.0
+        written = 0
+        while written < total:
+            session = sessions[written // session_rows]
+            count = min(batch, total - written, session_rows - written % session_rows)
+            rows = make_rows(model, session, start + timedelta(seconds=written * SAMPLE_PERIOD), count)
+            began = time.perf_counter()
+            with transaction.atomic():
+                model.objects.bulk_create(rows)
+            elapsed += time.perf_counter() - began
+            written += len(rows)
+
+        if connection.vendor == "postgresql":
+            # Sets the visibility map too, as autovacuum eventually does, so index-only scans apply
+            with connection.cursor() as cursor:
+                cursor.execute(f"VACUUM ANALYZE {table}")
+        size_after = relation_size(table)
+
+        self.stdout.write(f"[{name}] {written} rows in {elapsed:.2f} s: {written / elapsed:,.0f} rows/s")
+        if size_before is not None and size_after is not None:
+            self.stdout.write(f"[{name}] table + indexes: {(size_after - size_before) / written:.1f} bytes/row")
+        row_size = tuple_size(model, sessions[0])
+        if row_size is not None:
+            self.stdout.write(f"[{name}] row data: {row_size:.1f} bytes/row")
+
+    def bench_reads(self, name, model, sessions, reads):
+        picked = random.sample(sessions, min(reads, len(sessions)))
+        timings = []
+        rows = 0
+        for session in picked:
+            began = time.perf_counter()
+            rows = len(list(session_query(model, session.id)))
+            timings.append((time.perf_counter() - began) * 1000)
+        self.stdout.write(f"[{name}] session read ({rows} rows): median {statistics.median(timings):.1f} ms, "
+                          f"max {max(timings):.1f} ms")
+        plan = query_plan(session_query(model, picked[0].id))
+        if plan:
+            self.stdout.write(f"[{name}] plan: {plan}")
@@ -0,0 +1,58 @@
+# File: chat/management/commands/partition_telemetry.py
+# Maintenance of the monthly telemetry partitions (run it daily, e.g. from cron).
+
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from chat import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the telemetry partitions of the coming months and optionally detach old ones. "
+        "Detached partitions are plain tables that can be archived with pg_dump."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=3, help="Months to create ahead of the current one")
+        parser.add_argument("--detach-before", metavar="YYYY-MM",
+                            help="Detach the partitions of months before this one")
+        parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+        parser.add_argument("--list", action="store_true", help="List the partitions and their estimated rows")
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported(connection):
+            raise CommandError("Telemetry partitioning needs PostgreSQL")
+
+        detach_before = None
+        if options["detach_before"]:
+            try:
+                detach_before = datetime.strptime(options["detach_before"], "%Y-%m").replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise CommandError("--detach-before must look like 2025-01")
+
+        current = partitioning.month_start(datetime.now(timezone.utc))
+        with connection.cursor() as cursor:
+            for table in partitioning.PARTITIONED_TABLES:
+                if not partitioning.is_partitioned(cursor, table):
+                    raise CommandError(f"{table} is not partitioned, run the migrations first")
+
+                for offset in range(options["ahead"] + 1):
+                    month = partitioning.add_months(current, offset)
+                    with transaction.atomic():
+                        if partitioning.ensure_month_partition(cursor, table, month):
+                            self.stdout.write(f"Created {partitioning.partition_name(table, month)}")
+
+                if detach_before is not None:
+                    for name, _, _ in partitioning.list_partitions(cursor, table):
+                        month = partitioning.partition_month(name)
+                        if month is not None and month < detach_before:
+                            with transaction.atomic():
+                                partitioning.detach_partition(cursor, table, name, drop=options["drop"])
+                            self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
+
+                if options["list"]:
+                    for name, bound, rows in partitioning.list_partitions(cursor, table):
+                        self.stdout.write(f"{name:32} {rows:>12}  {bound}")
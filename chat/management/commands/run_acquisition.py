@@ -0,0 +1,47 @@
+# File: chat/management/commands/run_acquisition.py
+# Headless acquisition: runs the motor and sensor monitors without the web server.
+
+import asyncio
+import signal
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+
+from chat.acquisitionSupervisor import get_acquisition_supervisor
+from chat.activeSessions import get_active_session_id
+
+
+class Command(BaseCommand):
+    help = (
+        "Run motor and sensor acquisition in this process until interrupted. "
+        "Use it on machines without the web UI; it must not share the hardware with a running server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", type=int, help="Record into this session")
+        parser.add_argument("--user", type=int, help="Record into the active session of this user")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options.get("session"), options.get("user")))
+
+    async def run(self, session_id, user_id):
+        if session_id is None and user_id is not None:
+            session_id = await sync_to_async(get_active_session_id)(user_id)
+            if session_id is None:
+                raise CommandError(f"No active session for user {user_id}")
+
+        supervisor = get_acquisition_supervisor()
+        if session_id is not None:
+            await supervisor.bind_session(session_id)
+            self.stdout.write(f"Recording into session {session_id}")
+        supervisor.start()
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        self.stdout.write("Acquisition running, press Ctrl+C to stop")
+        await stop.wait()
+        await supervisor.stop()
+        self.stdout.write(str(supervisor.get_status()))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_sensordata_sample_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TouchEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node', models.SmallIntegerField()),
+                ('electrode', models.SmallIntegerField()),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='chat.protosession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'node', 'electrode', 'start'], name='chat_touche_session_96bc0e_idx'), models.Index(fields=['session', 'start'], name='chat_touche_session_beb8b6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Converts the telemetry tables into monthly range partitions on PostgreSQL.
+# Other databases (SQLite in development) keep the plain tables.
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLES = ("chat_protodata", "chat_sensordata")
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_table(cursor, table):
+    old = f"{table}_unpartitioned"
+
+    # Indexes and foreign keys are recreated under their original names after the copy
+    cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", [table])
+    indexes = [(name, definition) for name, definition in cursor.fetchall() if not name.endswith("_pkey")]
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+    """, [table])
+    foreign_keys = cursor.fetchall()
+    cursor.execute("SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [table])
+    is_identity = cursor.fetchone()[0] != ""
+
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    cursor.execute(f"""
+        CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY)
+        PARTITION BY RANGE ("timestamp")
+    """)
+    # The partition key has to be part of the primary key
+    cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, "timestamp")')
+
+    cursor.execute(f"SELECT min(\"timestamp\") FROM {old}")
+    first = cursor.fetchone()[0] or datetime.now(timezone.utc)
+    month = datetime(first.year, first.month, 1, tzinfo=timezone.utc)
+    last = add_months(datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+                      MONTHS_AHEAD)
+    while month <= last:
+        name = f"{table}_y{month.year:04d}m{month.month:02d}"
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                       [month, add_months(month, 1)])
+        month = add_months(month, 1)
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    if is_identity:
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {table}",
+                       [table])
+    else:
+        # serial column: keep the sequence alive when the old table is dropped
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [old])
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    cursor.execute(f"DROP TABLE {old}")
+
+    # The definitions were read before the rename, so they already target the new table
+    for name, definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+
+def partition_telemetry(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            partition_table(cursor, table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_touchevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_telemetry, migrations.RunPython.noop),
+    ]
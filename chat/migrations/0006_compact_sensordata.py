@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:16
+
+import chat.models
+from django.db import migrations, models
+
+LEGACY_COLUMNS = ("acc_x", "acc_y", "acc_z", "pitch", "roll", "gewicht_N", "touch_status", "griffhoehe")
+
+# sensor_id values written by SensorMonitor -> node bitmask (A2 has node_id 2, A3 node_id 3)
+NODE_MASKS = {"both": (1 << 2) | (1 << 3), "A2": 1 << 2, "A3": 1 << 3}
+
+
+def migrate_to_compact(apps, schema_editor):
+    SensorData = apps.get_model("chat", "SensorData")
+
+    # Rows from the MPU6050/HX711 era are kept in a side table before their columns go away
+    legacy = SensorData.objects.exclude(**{column: 0 for column in LEGACY_COLUMNS})
+    if legacy.exists():
+        qn = schema_editor.quote_name
+        columns = ", ".join(qn(c) for c in ("id", "session_id", "timestamp", "sensor_id", *LEGACY_COLUMNS))
+        condition = " OR ".join(f"{qn(c)} <> 0" for c in LEGACY_COLUMNS)
+        schema_editor.execute(
+            f"CREATE TABLE {qn('chat_sensordata_legacy')} AS "
+            f"SELECT {columns} FROM {qn(SensorData._meta.db_table)} WHERE {condition}"
+        )
+
+    for sensor_id, mask in NODE_MASKS.items():
+        SensorData.objects.filter(sensor_id=sensor_id).update(nodes=mask)
+
+
+def migrate_from_compact(apps, schema_editor):
+    SensorData = apps.get_model("chat", "SensorData")
+    for sensor_id, mask in NODE_MASKS.items():
+        SensorData.objects.filter(nodes=mask).update(sensor_id=sensor_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_partition_telemetry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sensordata',
+            name='nodes',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.RunPython(migrate_to_compact, migrate_from_compact),
+        migrations.RemoveIndex(
+            model_name='sensordata',
+            name='chat_sensor_sensor__bbdd6a_idx',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='acc_x',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='acc_y',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='acc_z',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='gewicht_N',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='griffhoehe',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='pitch',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='roll',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='sensor_id',
+        ),
+        migrations.RemoveField(
+            model_name='sensordata',
+            name='touch_status',
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='gewicht_A2',
+            field=chat.models.RealField(default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='gewicht_A3',
+            field=chat.models.RealField(default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='griffhoehe_A2',
+            field=chat.models.RealField(default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='griffhoehe_A3',
+            field=chat.models.RealField(default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='touchstatus_A2',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='touchstatus_A3',
+            field=models.SmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# BRIN indexes only exist on PostgreSQL; they are not part of the model state
+BRIN_INDEXES = {
+    "chat_protodata": "chat_protodata_timestamp_brin",
+    "chat_sensordata": "chat_sensordata_timestamp_brin",
+}
+
+
+def create_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, name in BRIN_INDEXES.items():
+        # Rows arrive in time order, so small block ranges stay selective
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING brin ("timestamp") WITH (pages_per_range = 32)'
+        )
+
+
+def drop_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in BRIN_INDEXES.values():
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_compact_sensordata'),
+    ]
+
+    operations = [
+        # Covering indexes first, so session reads always have an index
+        migrations.AddIndex(
+            model_name='protodata',
+            index=models.Index(fields=['session', 'timestamp'], include=('actual_position', 'actual_velocity', 'phase_current', 'voltage_logic'), name='chat_protodata_session_cover'),
+        ),
+        migrations.AddIndex(
+            model_name='sensordata',
+            index=models.Index(fields=['session', 'timestamp'], include=('gewicht_A2', 'touchstatus_A2', 'griffhoehe_A2', 'gewicht_A3', 'touchstatus_A3', 'griffhoehe_A3', 'nodes'), name='chat_sensordata_session_cover'),
+        ),
+        migrations.RemoveIndex(
+            model_name='protodata',
+            name='chat_protod_session_00a29a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sensordata',
+            name='chat_sensor_session_568053_idx',
+        ),
+        migrations.AlterField(
+            model_name='protodata',
+            name='session',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='chat.protosession'),
+        ),
+        migrations.AlterField(
+            model_name='sensordata',
+            name='session',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='chat.protosession'),
+        ),
+        migrations.RunPython(create_brin_indexes, drop_brin_indexes),
+    ]
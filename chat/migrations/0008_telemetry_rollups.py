@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_telemetry_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='protodata',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='TelemetryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('motor', 'motor'), ('sensor', 'sensor')], max_length=6)),
+                ('resolution', models.SmallIntegerField()),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.IntegerField()),
+                ('stats', models.JSONField()),
+                ('session', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='chat.protosession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'source', 'resolution', 'bucket_start'), name='unique_telemetry_rollup_bucket')],
+            },
+        ),
+    ]
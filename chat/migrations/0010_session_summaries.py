@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0009_export_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionSummary',
+            fields=[
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='chat.protosession')),
+                ('duration', models.FloatField()),
+                ('motor_samples', models.IntegerField(default=0)),
+                ('sensor_samples', models.IntegerField(default=0)),
+                ('peak_force_A2', models.FloatField(blank=True, null=True)),
+                ('peak_force_A3', models.FloatField(blank=True, null=True)),
+                ('position_min', models.IntegerField(blank=True, null=True)),
+                ('position_max', models.IntegerField(blank=True, null=True)),
+                ('mean_velocity', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('chat', '0010_session_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='baseuser',
+            index=models.Index(fields=['rollstuhl', 'geschlecht', 'geburtsdatum'], name='chat_baseuser_cohort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='baseuser',
+            index=models.Index(fields=['geburtsdatum'], name='chat_baseuser_birth_idx'),
+        ),
+    ]
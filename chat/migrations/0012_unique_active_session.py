@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:37
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def close_duplicate_active_sessions(apps, schema_editor):
+    """Keep only the newest active session of each user, as ProtoSession.save() intended"""
+    ProtoSession = apps.get_model("chat", "ProtoSession")
+    newest = (ProtoSession.objects.filter(is_active=True).values("user")
+              .annotate(newest=Max("id")).values_list("newest", flat=True))
+    stale = ProtoSession.objects.filter(is_active=True).exclude(id__in=list(newest))
+    for session in stale:
+        # The session should have been closed when the user's next session started
+        next_start = (ProtoSession.objects.filter(user_id=session.user_id, start_time__gt=session.start_time)
+                      .order_by("start_time").values_list("start_time", flat=True).first())
+        session.is_active = False
+        session.end_time = session.end_time or next_start or session.start_time
+        session.save(update_fields=["is_active", "end_time"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0011_cohort_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_active_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='protosession',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('user',), name='unique_active_session_per_user'),
+        ),
+    ]
@@ -1,5 +1,5 @@
-from datetime import datetime
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings  # Import settings for lazy user reference
 
@@ -37,6 +37,25 @@ class BaseUser(AbstractUser):
         blank=True
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Cohort filters (cohortAnalytics.py): the categorical fields first, then the age range
+            models.Index(fields=['rollstuhl', 'geschlecht', 'geburtsdatum'], name='chat_baseuser_cohort_idx'),
+            models.Index(fields=['geburtsdatum'], name='chat_baseuser_birth_idx'),
+        ]
+
+class ProtoSessionManager(models.Manager):
+
+    def start(self, user):
+        """Close the user's active session and open a new one in one transaction; returns (session, closed_old)"""
+        with transaction.atomic():
+            # Concurrent starts for the same user wait here instead of racing for the active slot
+            list(BaseUser.objects.select_for_update().filter(pk=user.pk).values_list("pk", flat=True))
+            closed_old = self.filter(user=user, is_active=True).exists()
+            session = self.create(user=user)
+        return session, closed_old
+
+
 class ProtoSession(models.Model):
     """Unified session for both motor and sensor data"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -44,19 +63,36 @@ class ProtoSession(models.Model):
     end_time = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
 
+    objects = ProtoSessionManager()
+
     def end_session(self):
-        self.end_time = datetime.now()
+        self.end_time = timezone.now()
         self.is_active = False
         self.save()
         
     def save(self, *args, **kwargs):
-        if self.is_active:
-            ProtoSession.objects.filter(user=self.user, is_active=True).update(is_active=False, end_time=datetime.now())
-        super().save(*args, **kwargs)
+        if not self.is_active:
+            super().save(*args, **kwargs)
+            return
+        # Only one active session per user (unique_active_session_per_user): close the others first
+        with transaction.atomic():
+            closed = list(ProtoSession.objects.filter(user_id=self.user_id, is_active=True)
+                          .exclude(pk=self.pk).values_list("pk", flat=True))
+            if closed:
+                ProtoSession.objects.filter(pk__in=closed).update(is_active=False, end_time=timezone.now())
+                # Closed sessions get their summary like the ones stopped through the stop views
+                from .sessionAnalytics import summarize_session_ids
+                transaction.on_commit(lambda: summarize_session_ids(closed))
+            super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = "Protocol Session"
         verbose_name_plural = "Protocol Sessions"
+        constraints = [
+            # Also the index behind every "active session of this user" lookup
+            models.UniqueConstraint(fields=['user'], condition=models.Q(is_active=True),
+                                    name='unique_active_session_per_user'),
+        ]
 
 
 # Keep motorsession as alias for backward compatibility
@@ -64,56 +100,138 @@ motorsession = ProtoSession
 
 
 class ProtoData(models.Model):
-    session = models.ForeignKey(ProtoSession, on_delete=models.CASCADE, null=True, blank=True)
+    # No separate FK index: the (session, timestamp) index below serves session lookups
+    session = models.ForeignKey(ProtoSession, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
     actual_position = models.IntegerField()
     actual_velocity = models.IntegerField()
     phase_current = models.IntegerField()
     voltage_logic = models.IntegerField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Sample time from MotorMonitor
     
     class Meta:
         indexes = [
-            models.Index(fields=['session', 'timestamp']),
+            # Covering index: reading a session in time order is an index-only scan on PostgreSQL
+            # (other backends ignore include). A BRIN index on timestamp is added by migration 0007.
+            models.Index(fields=['session', 'timestamp'],
+                         include=['actual_position', 'actual_velocity', 'phase_current', 'voltage_logic'],
+                         name='chat_protodata_session_cover'),
         ]
 
 
+class RealField(models.FloatField):
+    """Single precision float (PostgreSQL real, 4 bytes instead of 8); plenty for the sensor resolution"""
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "real"
+        return super().db_type(connection)
+
+
 class SensorData(models.Model):
-    session = models.ForeignKey(ProtoSession, on_delete=models.CASCADE, null=True, blank=True)
-    # MPU6050 data (accelerometer and gyroscope) - Legacy sensors
-    acc_x = models.FloatField(default=0.0)  # Acceleration X-axis in m/s²
-    acc_y = models.FloatField(default=0.0)  # Acceleration Y-axis in m/s²
-    acc_z = models.FloatField(default=0.0)  # Acceleration Z-axis in m/s²
-    pitch = models.FloatField(default=0.0)  # Pitch angle in degrees
-    roll = models.FloatField(default=0.0)   # Roll angle in degrees
-    
-    # HX711 + MPR121 data - Legacy sensors
-    gewicht_N = models.FloatField(default=0.0)      # Weight/force in Newtons
-    touch_status = models.IntegerField(default=0)    # Touch sensor status
-    griffhoehe = models.FloatField(default=0.0)     # Grip height in cm
-    
-    # New Arduino A2 sensor data
-    gewicht_A2 = models.FloatField(default=0.0)      # Weight/force from Arduino A2 in Newtons
-    touchstatus_A2 = models.IntegerField(default=0)  # Touch sensor status from Arduino A2
-    griffhoehe_A2 = models.FloatField(default=0.0)   # Grip height from Arduino A2 in cm
-    
-    # New Arduino A3 sensor data
-    gewicht_A3 = models.FloatField(default=0.0)      # Weight/force from Arduino A3 in Newtons
-    touchstatus_A3 = models.IntegerField(default=0)  # Touch sensor status from Arduino A3
-    griffhoehe_A3 = models.FloatField(default=0.0)   # Grip height from Arduino A3 in cm
-    
-    # Sensor identifier (for when sensors exist twice per sensor)
-    sensor_id = models.CharField(max_length=50, default='sensor_1')
-    
-    timestamp = models.DateTimeField(auto_now_add=True)  # Synchronized timestamp with ProtoData
+    # No separate FK index: the (session, timestamp) index below serves session lookups
+    session = models.ForeignKey(ProtoSession, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
+
+    # Arduino A2 sensor node
+    gewicht_A2 = RealField(default=0.0)                 # Weight/force in Newtons
+    touchstatus_A2 = models.SmallIntegerField(default=0)  # MPR121 electrode bitmask (12 bits)
+    griffhoehe_A2 = RealField(default=0.0)              # Grip height in cm
+
+    # Arduino A3 sensor node
+    gewicht_A3 = RealField(default=0.0)
+    touchstatus_A3 = models.SmallIntegerField(default=0)
+    griffhoehe_A3 = RealField(default=0.0)
+
+    # Bit n set: node with SensorNodeConfig.node_id n delivered the values of this row
+    nodes = models.SmallIntegerField(default=0)
+
+    timestamp = models.DateTimeField(default=timezone.now)  # Sample time, synchronized with ProtoData
     
     class Meta:
         indexes = [
-            models.Index(fields=['session', 'timestamp']),
-            models.Index(fields=['sensor_id', 'timestamp']),
+            # Covering index, see ProtoData
+            models.Index(fields=['session', 'timestamp'],
+                         include=['gewicht_A2', 'touchstatus_A2', 'griffhoehe_A2',
+                                  'gewicht_A3', 'touchstatus_A3', 'griffhoehe_A3', 'nodes'],
+                         name='chat_sensordata_session_cover'),
         ]
 
 
 # Keep sensorsession as alias for backward compatibility
 sensorsession = ProtoSession
 
-    
+
+class TouchEvent(models.Model):
+    """One contiguous touch of a single MPR121 electrode, derived from the touchstatus bitmasks"""
+    session = models.ForeignKey(ProtoSession, on_delete=models.CASCADE)
+    node = models.SmallIntegerField()       # SensorNodeConfig.node_id (2 = A2, 3 = A3)
+    electrode = models.SmallIntegerField()  # 0-11
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'node', 'electrode', 'start']),
+            models.Index(fields=['session', 'start']),
+        ]
+
+
+class TelemetryRollup(models.Model):
+    """Aggregates of one session's telemetry per time bucket, kept up to date while recording (see telemetryRollups.py)"""
+
+    class Source(models.TextChoices):
+        MOTOR = 'motor', 'motor'
+        SENSOR = 'sensor', 'sensor'
+
+    session = models.ForeignKey(ProtoSession, on_delete=models.CASCADE, db_index=False)
+    source = models.CharField(max_length=6, choices=Source.choices)
+    resolution = models.SmallIntegerField()  # bucket width in seconds
+    bucket_start = models.DateTimeField()
+    count = models.IntegerField()
+    stats = models.JSONField()  # {column: [min, max, sum, samples]}; samples missing in older rows = count
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'source', 'resolution', 'bucket_start'],
+                                    name='unique_telemetry_rollup_bucket'),
+        ]
+
+
+class ExportJob(models.Model):
+    """A CSV/Parquet export of one or more sessions, written by the worker in exportJobs.py"""
+
+    class Format(models.TextChoices):
+        CSV = 'csv', 'CSV'
+        PARQUET = 'parquet', 'Parquet'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'pending'
+        RUNNING = 'running', 'running'
+        DONE = 'done', 'done'
+        FAILED = 'failed', 'failed'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    session_ids = models.JSONField()  # sessions may be deleted after the export was requested
+    sources = models.JSONField(default=list)  # "motor" and/or "sensor"
+    format = models.CharField(max_length=7, choices=Format.choices, default=Format.CSV)
+    status = models.CharField(max_length=7, choices=Status.choices, default=Status.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    file_path = models.CharField(max_length=255, blank=True)  # zip archive below settings.EXPORT_DIR
+    rows = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)  # "host:pid" of the process running the job
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # refreshed while the job runs
+
+
+class SessionSummary(models.Model):
+    """Per-session metrics for comparing sessions, stored once a session has ended (see sessionAnalytics.py)"""
+    session = models.OneToOneField(ProtoSession, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    duration = models.FloatField()                           # seconds
+    motor_samples = models.IntegerField(default=0)
+    sensor_samples = models.IntegerField(default=0)
+    peak_force_A2 = models.FloatField(null=True, blank=True)  # max gewicht_A2
+    peak_force_A3 = models.FloatField(null=True, blank=True)
+    position_min = models.IntegerField(null=True, blank=True)
+    position_max = models.IntegerField(null=True, blank=True)
+    mean_velocity = models.FloatField(null=True, blank=True)  # mean of |actual_velocity|
+    computed_at = models.DateTimeField(auto_now=True)
@@ -1,14 +1,13 @@
 # File: motor_control/consumer.py
 # Main WebSocket consumer that coordinates all components
-import asyncio
-from .constants import MOTOR_IP
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
-from .motorcontrol.motorCommandHandler import MotorCommandHandler
-from .motorcontrol.motorMonitor import MotorMonitor
-from .motorcontrol.socketManager import SocketManager
 from .motorcontrol import startmotor
+from .motorcontrol.motionProfile import MotionProfile, ProfilePlayer
+from .motorcontrol.admittanceController import AdmittanceController, AdmittanceParams
+from .clientSender import ClientSender
+from .acquisitionSupervisor import ensure_acquisition_started
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +15,17 @@ class MotorConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.room_group_name = 'motor_control'
-        self.stop_event = asyncio.Event()
-        
-        # Initialize components
-        self.socketManager = SocketManager(MOTOR_IP, 18385)
-        self.commands = MotorCommandHandler(self.socketManager)
-        self.monitor = None  # Will be initialized after connection
+
+        # Socket, command handler and monitor belong to the acquisition supervisor
+        self.supervisor = None
+        self.commands = None
+        self.monitor = None
+        self.profile_player = None
+        self.admittance = None
         self.currentvalues= {}
-        
-        # Track background tasks for proper cleanup
-        self.background_tasks = []
+
+        # Outbound queue so slow clients never block the receive loop
+        self.sender = ClientSender(self.send_text)
 
     async def connect(self):
         # Add channel to group
@@ -34,75 +34,45 @@ class MotorConsumer(AsyncWebsocketConsumer):
             self.channel_name 
         )
 
-        # Connect socket
-        self.socketManager.connect()
-        
-        # Initialize monitor after socket is connected
-        self.monitor = MotorMonitor(
-            self.socketManager, 
-            self.send_motor_value, 
-            self.send_response,
-            self.stop_event
-        )
-        
-        
-        # Start background tasks
-        self.background_tasks.append(asyncio.create_task(self.monitor.listen_for_motor_responses()))
-        self.background_tasks.append(asyncio.create_task(self.monitor.send_motor_parameter_requests(
-           self.monitor.motor_values, 0.3)))
-        self.background_tasks.append(asyncio.create_task(self.monitor.send_motor_parameter_requests(
-            self.monitor.motor_values_important, 0.08)))
-        self.currentvalues=self.monitor.motor_registers             # how many packets per second?   1/0.3 =3.33 P/s   + 1/0.07 = 14.2857 P/s 14.2857+3.33 = 17.6157 P/s     Der Motor kriegt jede Sekun
+        # Attach to the long-lived acquisition, starting it if this is the first client
+        self.supervisor = await ensure_acquisition_started()
+        self.commands = self.supervisor.commands
+        self.monitor = self.supervisor.motor_monitor
+        self.profile_player = ProfilePlayer(self.commands, self.monitor, self.send_response)
+        self.currentvalues=self.monitor.motor_registers
 
         # Accept the websocket connection
         await self.accept()
-        
-        # Send initial packet
-        await self.commands.send_command([self.commands.command_dict['init_packet'][0]])
+        self.sender.start()
+        self.supervisor.attach("motor", self.send_frame)
 
     async def disconnect(self, close_code):
         logger.info(f"Motor consumer disconnecting with code: {close_code}")
         
-        # Set stop event to halt monitoring
-        self.stop_event.set()
-
-        # Properly shutdown background tasks
-        for task in self.background_tasks:
-            if not task.done():
-                try:
-                    # Wait for the task to complete gracefully
-                    await asyncio.wait_for(task, timeout=2.0)
-                except asyncio.TimeoutError:
-                    logger.warning("Background task didn't complete within timeout, cancelling")
-                    task.cancel()
-                    try:
-                        await task
-                    except asyncio.CancelledError:
-                        pass
-                except Exception as e:
-                    logger.error(f"Error during background task shutdown: {e}")
-
-        # Final cleanup for monitor
-        if self.monitor:
+        # Abort a running motion profile while the socket is still open
+        if self.profile_player:
+            try:
+                await self.profile_player.stop()
+            except Exception as e:
+                logger.error(f"Error stopping motion profile: {e}")
+        if self.admittance:
             try:
-                # Turn off logging and flush any remaining data
-                if self.monitor.logging_bool:
-                    await self.monitor.logging_bool_off()
+                await self.admittance.stop()
             except Exception as e:
-                logger.error(f"Error during monitor cleanup: {e}")
+                logger.error(f"Error stopping admittance control: {e}")
+
+        # Acquisition and logging keep running in the supervisor
+        if self.supervisor:
+            self.supervisor.detach("motor", self.send_frame)
 
         # Remove from channel group
         try:
             await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
         except Exception as e:
             logger.error(f"Error removing from channel group: {e}")
-            
-        # Close socket connection
-        try:
-            self.socketManager.close()
-        except Exception as e:
-            logger.error(f"Error closing socket: {e}")
-            
+
+        await self.sender.stop()
+
         logger.info(f"Motor consumer disconnected with code: {close_code}")
 
     async def receive(self, text_data):
@@ -132,6 +102,47 @@ class MotorConsumer(AsyncWebsocketConsumer):
                 await self.send_response({"type": "logging_status", "status": "failed", "reason": "No active session"})
         elif message_type == "stop_logging":
             await self.monitor.logging_bool_off()
+        elif message_type == "upload_profile":
+            try:
+                profile = MotionProfile.from_message(text_data_json)
+                self.profile_player.load(profile)
+                await self.send_response({"type": "profile_status", "status": "loaded",
+                                          "points": len(profile.points), "duration": profile.duration})
+            except (ValueError, TypeError, RuntimeError) as e:
+                await self.send_response({"type": "profile_status", "status": "rejected", "reason": str(e)})
+        elif message_type == "start_profile":
+            try:
+                if self.admittance and self.admittance.running:
+                    raise RuntimeError("admittance control is running")
+                self.profile_player.start()
+            except RuntimeError as e:
+                await self.send_response({"type": "profile_status", "status": "rejected", "reason": str(e)})
+        elif message_type == "stop_profile":
+            await self.profile_player.stop()
+        elif message_type == "start_admittance":
+            try:
+                if self.profile_player.running:
+                    raise RuntimeError("a profile is running")
+                if self.admittance and self.admittance.running:
+                    raise RuntimeError("admittance control is already running")
+                params = AdmittanceParams.from_message(text_data_json)
+                self.admittance = AdmittanceController(self.commands, params, self.send_response)
+                self.admittance.start()
+            except (ValueError, TypeError, RuntimeError) as e:
+                await self.send_response({"type": "admittance_status", "status": "rejected", "reason": str(e)})
+        elif message_type == "stop_admittance":
+            if self.admittance:
+                await self.admittance.stop()
+        elif message_type == "set_max_rate":
+            try:
+                self.sender.set_max_rate(text_data_json.get('max_rate'))
+                await self.send_response({"type": "stream_stats", **self.sender.get_stats()})
+            except ValueError as e:
+                await self.send_response({"type": "error", "message": str(e)})
+        elif message_type == "get_stream_stats":
+            await self.send_response({"type": "stream_stats", **self.sender.get_stats()})
+        elif message_type == "get_acquisition_status":
+            await self.send_response({"type": "acquisition_status", **self.supervisor.get_status()})
 
     async def send_motor_value(self, key, value):
         await self.channel_layer.group_send(
@@ -140,12 +151,19 @@ class MotorConsumer(AsyncWebsocketConsumer):
         )
 
     async def send_response(self, message):
-        await self.send(text_data=json.dumps(message))
+        self.sender.send_message(message)
+
+    async def send_frame(self, frame):
+        """Telemetry frames from the monitor; conflated when the client falls behind"""
+        self.sender.send_frame(frame)
+
+    async def send_text(self, text):
+        await self.send(text_data=text)
 
     async def motor_value(self, event):
         key = event['key']
         value = event['value']
-        await self.send(text_data=json.dumps({
+        self.sender.send_message({
             'type': key,
             'value': value,
-        }))
\ No newline at end of file
+        })
\ No newline at end of file
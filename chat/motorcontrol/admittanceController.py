@@ -0,0 +1,218 @@
+# File: motor_control/admittanceController.py
+# Server-side force-to-velocity (admittance) control loop.
+#
+# Reads the handle forces from the running SensorMonitor and drives the
+# motor through a virtual mass-damper: M * dv/dt + B * v = F, so the user
+# feels a configurable inertia and friction instead of a fixed velocity.
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, asdict, fields
+
+from ..models import SensorData
+from ..sensorcontrol.config import SensorMonitorConfig
+from ..telemetryHub import telemetry_hub
+from .motorCommandHandler import setpoint_limit
+
+logger = logging.getLogger(__name__)
+
+MAX_STEP_PERIODS = 5  # longest integration step after an overrun, in loop periods
+
+
+@dataclass
+class AdmittanceParams:
+    """Parameters of the admittance loop (velocity in drive units, force in N)"""
+    virtual_mass: float = 2.0          # N per (velocity unit / s)
+    virtual_damping: float = 0.5       # N per velocity unit
+    deadband: float = 2.0              # N, net forces below this are ignored
+    max_velocity: float = 3000.0
+    rate_hz: float = 100.0
+    push_key: str = "gewicht_A2"       # force pushing towards positive velocity
+    pull_key: str = "gewicht_A3"       # force pushing towards negative velocity
+    max_sensor_age: float = 0.2        # s, older readings stop the motor
+
+    @classmethod
+    def from_message(cls, message):
+        known = {f.name: f.type for f in fields(cls)}
+        values = {}
+        for name, value in message.get("params", {}).items():
+            if name not in known:
+                raise ValueError(f"Unknown admittance parameter: {name}")
+            values[name] = str(value) if known[name] is str else float(value)
+        params = cls(**values)
+
+        # Comparisons with NaN are always false, so check finiteness first
+        for name, value in asdict(params).items():
+            if known[name] is float and not math.isfinite(value):
+                raise ValueError(f"{name} must be a finite number")
+        if params.virtual_mass <= 0 or params.max_velocity <= 0 or params.max_sensor_age <= 0:
+            raise ValueError("virtual_mass, max_velocity and max_sensor_age must be > 0")
+        if params.virtual_damping < 0 or params.deadband < 0:
+            raise ValueError("virtual_damping and deadband must be >= 0")
+        if not 0 < params.rate_hz <= 500:
+            raise ValueError("rate_hz must be in (0, 500]")
+        force_keys = sensor_db_keys()
+        for name in ("push_key", "pull_key"):
+            if getattr(params, name) not in force_keys:
+                raise ValueError(f"{name} must be one of {', '.join(sorted(force_keys))}")
+        # The server, not the client, has the last word on how fast the motor may turn
+        params.max_velocity = min(params.max_velocity, float(setpoint_limit("velocity")))
+        return params
+
+
+def sensor_db_keys():
+    """Sensor values that are stored in SensorData, e.g. gewicht_A2"""
+    model_fields = {field.name for field in SensorData._meta.get_fields()}
+    return {node.key(field_name) for node in SensorMonitorConfig.get_all_node_configs().values()
+            for field_name in node.field_names if node.key(field_name) in model_fields}
+
+
+class LoopTimingStats:
+    """Period and jitter of a fixed-rate loop (Welford running variance)"""
+
+    def __init__(self, target_period):
+        self.target_period = target_period
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_period = 0.0
+        self.overruns = 0
+
+    def record(self, period):
+        self.count += 1
+        delta = period - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (period - self.mean)
+        self.max_period = max(self.max_period, period)
+        if period > 1.5 * self.target_period:
+            self.overruns += 1
+
+    def as_dict(self):
+        jitter = math.sqrt(self.m2 / self.count) if self.count > 1 else 0.0
+        return {
+            "cycles": self.count,
+            "mean_period_ms": self.mean * 1000,
+            "jitter_ms": jitter * 1000,
+            "max_period_ms": self.max_period * 1000,
+            "overruns": self.overruns,
+        }
+
+
+class AdmittanceController:
+    motion_name = "admittance control"
+
+    def __init__(self, command_handler, params, send_response_callback, report_interval=1.0):
+        self.commands = command_handler
+        self.params = params
+        self.send_response = send_response_callback
+        self.report_interval = report_interval
+        self.velocity = 0.0
+        self.timing = LoopTimingStats(1.0 / params.rate_hz)
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("admittance control is already running")
+        self.commands.acquire_motion(self)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+    def net_force(self, sensor_values):
+        force = sensor_values.get(self.params.push_key, 0.0) - sensor_values.get(self.params.pull_key, 0.0)
+        if abs(force) <= self.params.deadband:
+            return 0.0
+        return force - math.copysign(self.params.deadband, force)
+
+    def step(self, force, dt):
+        """Integrate the virtual mass-damper by dt and return the clamped velocity"""
+        p = self.params
+        self.velocity += dt * (force - p.virtual_damping * self.velocity) / p.virtual_mass
+        self.velocity = max(-p.max_velocity, min(p.max_velocity, self.velocity))
+        return self.velocity
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.params.rate_hz
+        self.velocity = 0.0
+        self.timing = LoopTimingStats(period)
+        status = "finished"
+        reason = None
+
+        await self.send_response({"type": "admittance_status", "status": "started", "params": asdict(self.params)})
+        next_cycle = loop.time()
+        last_cycle = None
+        next_report = time.monotonic() + self.report_interval
+        force = 0.0
+        try:
+            while True:
+                now = loop.time()
+                dt = period
+                if last_cycle is not None:
+                    self.timing.record(now - last_cycle)
+                    # Integrate the time that actually passed, but not a long stall at once
+                    dt = min(now - last_cycle, MAX_STEP_PERIODS * period)
+                last_cycle = now
+
+                sensor_monitor = telemetry_hub.get_producer("sensor")
+                if sensor_monitor is None:
+                    status, reason = "failed", "sensor monitoring is not running"
+                    break
+                sensor_values, age = sensor_monitor.get_latest_values()
+                if age is None or age > self.params.max_sensor_age:
+                    status, reason = "failed", "sensor data is stale"
+                    break
+
+                force = self.net_force(sensor_values)
+                await self.commands.send_setpoint("velocity", round(self.step(force, dt)))
+
+                if time.monotonic() >= next_report:
+                    motor_monitor = telemetry_hub.get_producer("motor")
+                    actual_velocity = None
+                    if motor_monitor is not None:
+                        actual_velocity = motor_monitor.motor_registers.get(
+                            motor_monitor.all_motor_values.get("actual_velocity"))
+                    await self.send_response({
+                        "type": "admittance_status",
+                        "status": "running",
+                        "force": force,
+                        "velocity_setpoint": self.velocity,
+                        "actual_velocity": actual_velocity,
+                        **self.timing.as_dict(),
+                    })
+                    next_report += self.report_interval
+
+                # Fixed rate on absolute deadlines; skip missed cycles instead of bursting
+                next_cycle += period
+                if next_cycle < loop.time():
+                    next_cycle = loop.time()
+                await asyncio.sleep(next_cycle - loop.time())
+        except asyncio.CancelledError:
+            status = "stopped"
+        except Exception as e:
+            logger.error(f"Error in admittance control loop: {e}")
+            status, reason = "failed", str(e)
+        finally:
+            # Never leave the motor running on the last setpoint
+            self.velocity = 0.0
+            await self.commands.send_setpoint("velocity", 0)
+            message = {"type": "admittance_status", "status": status, **self.timing.as_dict()}
+            if reason:
+                message["reason"] = reason
+            self.commands.release_motion(self)
+            await self.send_response(message)
+        if status == "stopped":
+            raise asyncio.CancelledError
@@ -0,0 +1,195 @@
+# File: motor_control/motionProfile.py
+# Streams an uploaded velocity/current trajectory to the drive with
+# deadline-based timing and reports the tracking error from telemetry.
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from .motorCommandHandler import setpoint_limit
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_POINTS = 20000
+MAX_PROFILE_DURATION = 3600  # seconds
+
+# Telemetry register compared against the setpoint of each mode
+TRACKED_REGISTERS = {
+    "velocity": "actual_velocity",
+    "current": "phase_current",
+}
+
+
+def parse_setpoint(value, mode):
+    """Integer setpoint of a profile point; raises ValueError unless finite and within the mode's limit"""
+    value = float(value)
+    limit = setpoint_limit(mode)
+    if not math.isfinite(value) or abs(value) > limit:
+        raise ValueError(f"{mode} setpoints must be within ±{limit}")
+    return int(value)
+
+
+@dataclass
+class MotionProfile:
+    """Time-stamped setpoints; t is in seconds from the profile start"""
+    mode: str
+    points: List[Tuple[float, int]]
+
+    @classmethod
+    def from_message(cls, message):
+        """Build and validate a profile from an 'upload_profile' websocket message"""
+        mode = message.get("mode")
+        if mode not in TRACKED_REGISTERS:
+            raise ValueError(f"mode must be one of {sorted(TRACKED_REGISTERS)}")
+
+        points = [(float(t), parse_setpoint(value, mode)) for t, value in message.get("points", [])]
+        if not points:
+            raise ValueError("profile has no points")
+        if len(points) > MAX_PROFILE_POINTS:
+            raise ValueError(f"profile has more than {MAX_PROFILE_POINTS} points")
+        previous_t = 0.0
+        for t, _ in points:
+            # NaN compares false with everything and would pass the ordering check
+            if not math.isfinite(t):
+                raise ValueError("point times must be finite")
+            if t < previous_t:
+                raise ValueError("point times must be non-negative and ascending")
+            previous_t = t
+        if previous_t > MAX_PROFILE_DURATION:
+            raise ValueError(f"profile is longer than {MAX_PROFILE_DURATION} s")
+        return cls(mode, points)
+
+    @property
+    def duration(self):
+        return self.points[-1][0]
+
+
+class ProfilePlayer:
+    motion_name = "a motion profile"
+
+    def __init__(self, command_handler, monitor, send_response_callback, report_interval=0.1):
+        self.commands = command_handler
+        self.monitor = monitor
+        self.send_response = send_response_callback
+        self.report_interval = report_interval
+        self.profile = None
+        self.task = None
+
+        # Tracking statistics of the current run
+        self.setpoint = None
+        self.error_count = 0
+        self.error_square_sum = 0.0
+        self.max_abs_error = 0.0
+        self.max_lateness_ms = 0.0
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def load(self, profile):
+        if self.running:
+            raise RuntimeError("a profile is already running")
+        self.profile = profile
+
+    def start(self):
+        if self.profile is None:
+            raise RuntimeError("no profile uploaded")
+        if self.running:
+            raise RuntimeError("a profile is already running")
+        self.commands.acquire_motion(self)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Abort the running profile and command a zero setpoint"""
+        if not self.running:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        # A task cancelled before it ran never reached its finally
+        self.commands.release_motion(self)
+        # Unless another controller took over the motor in the meantime
+        if self.commands.motion_owner is None:
+            await self.commands.send_setpoint(self.profile.mode, 0)
+
+    def actual_value(self):
+        address = self.monitor.all_motor_values.get(TRACKED_REGISTERS[self.profile.mode])
+        return self.monitor.motor_registers.get(address)
+
+    def track(self):
+        """Compare the latest telemetry against the active setpoint"""
+        actual = self.actual_value()
+        if actual is None or self.setpoint is None:
+            return actual, None
+        error = self.setpoint - actual
+        self.error_count += 1
+        self.error_square_sum += error * error
+        self.max_abs_error = max(self.max_abs_error, abs(error))
+        return actual, error
+
+    def summary(self):
+        rms = math.sqrt(self.error_square_sum / self.error_count) if self.error_count else None
+        return {
+            "rms_error": rms,
+            "max_abs_error": self.max_abs_error,
+            "max_lateness_ms": self.max_lateness_ms,
+        }
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        profile = self.profile
+        self.setpoint = None
+        self.error_count = 0
+        self.error_square_sum = 0.0
+        self.max_abs_error = 0.0
+        self.max_lateness_ms = 0.0
+
+        start = loop.time()
+        next_report = start
+        index = 0
+        await self.send_response({"type": "profile_status", "status": "started",
+                                  "points": len(profile.points), "duration": profile.duration})
+        try:
+            while index < len(profile.points):
+                # Absolute deadlines: late wakeups never shift the rest of the profile
+                next_point = start + profile.points[index][0]
+                await asyncio.sleep(max(0.0, min(next_point, next_report) - loop.time()))
+                now = loop.time()
+
+                while index < len(profile.points) and start + profile.points[index][0] <= now:
+                    t, value = profile.points[index]
+                    await self.commands.send_setpoint(profile.mode, value)
+                    self.setpoint = value
+                    self.max_lateness_ms = max(self.max_lateness_ms, (now - start - t) * 1000)
+                    index += 1
+
+                if now >= next_report:
+                    actual, error = self.track()
+                    await self.send_response({
+                        "type": "profile_status",
+                        "status": "running",
+                        "elapsed": now - start,
+                        "index": index,
+                        "setpoint": self.setpoint,
+                        "actual": actual,
+                        "error": error,
+                    })
+                    next_report += self.report_interval
+                    if next_report < now:
+                        next_report = now + self.report_interval
+
+            self.track()
+            await self.send_response({"type": "profile_status", "status": "finished", **self.summary()})
+        except asyncio.CancelledError:
+            await self.send_response({"type": "profile_status", "status": "stopped", "index": index,
+                                      **self.summary()})
+            raise
+        except Exception as e:
+            logger.error(f"Error while streaming motion profile: {e}")
+            await self.send_response({"type": "profile_status", "status": "failed", "reason": str(e)})
+        finally:
+            self.commands.release_motion(self)
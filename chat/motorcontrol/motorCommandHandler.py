@@ -1,14 +1,41 @@
 import asyncio
+import logging
+from collections import deque
 
-delay = 0.05  # Delay between commands
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+delay = 0.05  # Delay between commands without acknowledgement
+
+
+def setpoint_limit(mode):
+    """Largest absolute setpoint clients may stream in a mode ('velocity' or 'current')"""
+    if mode == 'velocity':
+        return getattr(settings, 'MOTOR_MAX_VELOCITY', 5000)
+    if mode == 'current':
+        return getattr(settings, 'MOTOR_MAX_CURRENT', 3000)
+    raise ValueError(f"Unknown setpoint mode: {mode}")
 
 class MotorCommandHandler:
-    def __init__(self, socketManager):
+    def __init__(self, socketManager, window=4, ack_timeout=0.25):
         self.socketManager = socketManager
         self.current_velocity = 0
         self.current_hex = "00000000"  # Default current hex
         self.semaphore = asyncio.Semaphore(1)
 
+        # Acknowledgement-driven pipelining: up to `window` writes in flight,
+        # each matched to the drive's write response by object address (e.g. 400301)
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self.ack_enabled = False
+        self.pending_acks = {}  # address -> deque of futures, oldest first
+        self.failed_writes = 0
+
+        # The one streaming controller (profile player or admittance loop) allowed to drive the motor;
+        # the handler is shared by every consumer through the acquisition supervisor
+        self.motion_owner = None
+
 
 
         # Base parts of the protocol
@@ -45,15 +72,76 @@ class MotorCommandHandler:
 
     def to_twos_complement(self, value, bits):
         """Convert an integer to its two's complement representation."""
+        # Anything wider would produce a field of the wrong length in the frame
+        if not -(1 << (bits - 1)) <= value < (1 << bits):
+            raise ValueError(f"{value} does not fit in {bits} bits")
         if value < 0:
             value = (1 << bits) + value
         # Create format string for the specified number of bits
         format_string = f'0{bits // 4}X'
         return format(value, format_string)
 
+    def acquire_motion(self, owner):
+        """Make owner the only controller streaming setpoints; raises RuntimeError while another one runs"""
+        current = self.motion_owner
+        if current is not None and current is not owner and current.running:
+            raise RuntimeError(f"the motor is already driven by {current.motion_name}")
+        self.motion_owner = owner
+
+    def release_motion(self, owner):
+        if self.motion_owner is owner:
+            self.motion_owner = None
+
+    def use_acknowledgements(self, monitor):
+        """Match write responses received by the monitor instead of sleeping after each command"""
+        monitor.on_write_response = self.acknowledge
+        self.ack_enabled = True
+
+    @staticmethod
+    def write_address(formatted_command):
+        """Object index + subindex of a write command (hex chars 32-38, like the responses), or None"""
+        command_hex = formatted_command.hex()
+        if len(command_hex) <= 38 or not command_hex.startswith("444244"):
+            return None
+        return command_hex[32:38]
+
+    def acknowledge(self, address, response_hex):
+        """Called by the monitor for every response that is not a polled register"""
+        waiting = self.pending_acks.get(address)
+        while waiting:
+            future = waiting.popleft()
+            if not future.done():
+                future.set_result(response_hex)
+                break
+        if waiting is not None and not waiting:
+            del self.pending_acks[address]
+
+    def _expect_ack(self, address):
+        future = asyncio.get_running_loop().create_future()
+        self.pending_acks.setdefault(address, deque()).append(future)
+        return future
+
+    async def _await_ack(self, in_flight, failed):
+        address, future, deadline = in_flight
+        try:
+            await asyncio.wait_for(future, max(0.0, deadline - asyncio.get_running_loop().time()))
+        except asyncio.TimeoutError:
+            failed.append(address)
+            waiting = self.pending_acks.get(address)
+            if waiting and future in waiting:
+                waiting.remove(future)
+            if waiting is not None and not waiting:
+                del self.pending_acks[address]
+
     async def send_command(self, command_list):
-        """Sends a list of commands, acquiring the semaphore and releasing it."""
+        """Sends a list of commands, acquiring the semaphore and releasing it.
+
+        Returns the addresses of writes that were not acknowledged in time.
+        """
+        failed = []
         async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            in_flight = deque()
             for command in command_list:
                 # Check if command is a lambda or function
                 if callable(command):
@@ -62,27 +150,75 @@ class MotorCommandHandler:
                 
                 # Replace dashes and convert to bytes
                 formatted_command = bytes.fromhex(command.replace('-', ''))
+                address = self.write_address(formatted_command) if self.ack_enabled else None
+
+                if address is None:
+                    # No response to wait for: wait for writes in flight, then keep the old spacing
+                    while in_flight:
+                        await self._await_ack(in_flight.popleft(), failed)
+                    self.socketManager.send(formatted_command)
+                    await asyncio.sleep(delay)  # Add small delay between commands
+                    continue
+
+                while len(in_flight) >= self.window:
+                    await self._await_ack(in_flight.popleft(), failed)
+                future = self._expect_ack(address)
                 self.socketManager.send(formatted_command)
-                await asyncio.sleep(delay)  # Add small delay between commands
+                in_flight.append((address, future, loop.time() + self.ack_timeout))
+
+            while in_flight:
+                await self._await_ack(in_flight.popleft(), failed)
+
+        if failed:
+            self.failed_writes += len(failed)
+            logger.warning(f"Motor writes not acknowledged: {failed}")
+        return failed
 
     async def handle_command(self, command, send_response_callback):
         if command in self.command_dict:
             command_list = self.command_dict[command]
-            await self.send_command(command_list)
-            await send_response_callback({'status': 'Command sent!'})
+            failed = await self.send_command(command_list)
+            if failed:
+                await send_response_callback({'status': 'Command failed', 'failed_writes': failed})
+            else:
+                await send_response_callback({'status': 'Command sent!'})
         else:
             await send_response_callback({'status': 'Invalid command.'})
 
+    def velocity_command(self, target_velocity):
+        """Write command for the velocity setpoint (object 4300)"""
+        velocity_hex = self.to_twos_complement(int(target_velocity), 32)
+        return f"44424450000001000-30000000-7000000-4300-01-{velocity_hex}"
+
+    def current_command(self, current):
+        """Write command for the current setpoint (object 4200)"""
+        return f"44424450000001000-30000000-7000000-4200-01-{self.to_twos_complement(int(current), 32)}"
+
+    async def send_setpoint(self, mode, value):
+        """Send a single velocity or current setpoint without the inter-command delay.
+
+        Used for streamed trajectories where the caller owns the timing.
+        """
+        if mode == 'velocity':
+            command = self.velocity_command(value)
+            self.current_velocity = int(value)
+        elif mode == 'current':
+            self.current_hex = self.to_twos_complement(int(value), 32)
+            command = self.current_command(value)
+        else:
+            raise ValueError(f"Unknown setpoint mode: {mode}")
+        async with self.semaphore:
+            self.socketManager.send(bytes.fromhex(command.replace('-', '')))
+
     async def handle_set_velocity(self, target_velocity, send_response_callback):
         # Convert target velocity to hex and create command
-        velocity_hex = self.to_twos_complement(int(target_velocity), 32)
-        command = f"44424450000001000-30000000-7000000-4300-01-{velocity_hex}"
+        command = self.velocity_command(target_velocity)
         await self.send_command([command])
         self.current_velocity = int(target_velocity)
         await send_response_callback({'status': f'Set velocity to {target_velocity}'})
 
     async def handle_set_current(self, current, send_response_callback):
         self.current_hex = self.to_twos_complement(int(current), 32)
-        command = f"44424450000001000-30000000-7000000-4200-01-{self.current_hex}"
+        command = self.current_command(current)
         await self.send_command([command])
         await send_response_callback({'status': f'Set current to {current}'})
\ No newline at end of file
@@ -2,11 +2,14 @@ import asyncio
 import logging
 import time
 from collections import deque
-from django.utils import timezone
+from datetime import datetime, timezone
 from django.db import transaction
 
-from ..models import ProtoData, BaseUser, ProtoSession
-from asgiref.sync import sync_to_async
+from ..models import ProtoData
+from ..telemetryDatabase import telemetry_db_to_async
+from ..telemetryHub import telemetry_hub
+from ..telemetryRollups import update_rollups
+from ..activeSessions import get_active_session_id
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +20,12 @@ class MotorMonitor:
         self.send_response = send_response_callback
         self.stop_event = stop_event
         self.logging_bool = False
-        self.user_id = 0
+        self.session_id = None  # ProtoSession the recording is bound to
         self.previous_motor_registers = {}
+
+        # Called with (address, response_hex) for responses that are not polled registers,
+        # i.e. write acknowledgements (see MotorCommandHandler.use_acknowledgements)
+        self.on_write_response = None
         
         # Motor registers and values
         self.motor_registers = {}
@@ -52,12 +59,6 @@ class MotorMonitor:
         self.db_write_interval = 20 
         self.data_buffer = deque(maxlen=500) 
         
-        # Cache for user and session objects
-        self.user_cache = None
-        self.session_cache = None
-        self.last_cache_update = 0
-        self.cache_ttl = 60  # Cache TTL in seconds
-        
         # New: Track when to send batched data to websocket
         self.last_websocket_send_time = time.time()
         self.websocket_send_interval = 0.03  # Send every 20ms
@@ -77,6 +78,7 @@ class MotorMonitor:
             actualvelocity_address = self.all_motor_values.get("actual_velocity")
             actualposition_address = self.all_motor_values.get("actual_position")
             filtered_current_adress = self.all_motor_values.get("filtered_current")
+            telemetry_hub.register_producer("motor", self)
             
             while not self.stop_event.is_set():
                 try:
@@ -100,6 +102,8 @@ class MotorMonitor:
 
                     # Look up the address name
                     format_address = self.reverse_motor_values.get(address)
+                    if format_address is None and self.on_write_response is not None:
+                        self.on_write_response(address, response_hex)
 
                     if len(response_hex) > 38:
                         value_hex = response_hex[38:]
@@ -115,11 +119,9 @@ class MotorMonitor:
                         else:
                             value = int(value_hex, 16)
 
-                        value_str = str(value).ljust(15)
-
-                        # Updated logging: Only log if address is not in ignore list
-                        if address not in self.log_ignore_addresses:
-                            logger.info(f"{format_address}  Wert = {value_str} time {time.time()}")
+                        # Per-datagram register log: DEBUG only, formatted only when enabled
+                        if address not in self.log_ignore_addresses and logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("%s  Wert = %-15s time %s", format_address, value, time.time())
                         
                         # Update motor registers
                         self.motor_registers[address] = value
@@ -138,6 +140,7 @@ class MotorMonitor:
 
                         # Format data and send, regardless of changes
                         formatted_data = self.format_motor_data_for_websocket(motor_data_copy, dbw_flag, current_time)
+                        telemetry_hub.publish("motor", formatted_data)
                         await self.send_response(formatted_data)
 
                         # Increment counter
@@ -145,7 +148,7 @@ class MotorMonitor:
 
                         # Write to DB if needed
                         if self.logging_bool and self.websocket_send_counter % self.db_write_frequency == 0:
-                            self.data_buffer.append({'data': motor_data_copy})
+                            self.data_buffer.append({'data': motor_data_copy, 'timestamp': current_time})
                             self.db_write_flag = True
 
                         self.last_websocket_send_time = current_time
@@ -174,6 +177,7 @@ class MotorMonitor:
         except Exception as e:
             logger.error(f"Error in listen_for_motor_responses: {e}")
         finally:
+            telemetry_hub.unregister_producer("motor", self)
             # Final cleanup - write any remaining buffered data
             if self.data_buffer and self.logging_bool:
                 try:
@@ -244,42 +248,13 @@ class MotorMonitor:
         """Returns a copy of the all_motor_values dictionary."""
         return self.motor_registers.copy()  # Return a copy to prevent external modification
 
-    @sync_to_async
-    def _get_user_and_session(self):
-        """Get and cache user and session objects"""
-        # Check if we're in shutdown mode
-        if self.stop_event.is_set():
-            return None, None
-            
-        current_time = time.time()
-
-        # Check if cache needs refresh
-        if (self.user_cache is None or self.session_cache is None or
-                current_time - self.last_cache_update > self.cache_ttl):
-            try:
-                user = BaseUser.objects.get(id=self.user_id)
-                session = ProtoSession.objects.filter(user=user, is_active=True).first()
-
-                if session:
-                    self.user_cache = user
-                    self.session_cache = session
-                    self.last_cache_update = current_time
-                    return user, session
-                else:
-                    logger.error(f"No active session found for user {self.user_id}")
-                    return None, None
-            except BaseUser.DoesNotExist:
-                logger.error(f"User with ID {self.user_id} does not exist")
-                return None, None
-            except Exception as e:
-                logger.error(f"Error getting user and session: {e}")
-                return None, None
-        else:
-            # Return cached values
-            return self.user_cache, self.session_cache
-
-    @sync_to_async
-    def _bulk_create_proto_data(self, data_points, session):
+    @telemetry_db_to_async("motor")
+    def _get_active_session_id(self, user_id):
+        """Primary key of the user's active session, or None"""
+        return get_active_session_id(user_id)
+
+    @telemetry_db_to_async("motor")
+    def _bulk_create_proto_data(self, data_points, session_id):
         """Bulk create ProtoData objects"""
         # Check if we're in shutdown mode
         if self.stop_event.is_set():
@@ -293,14 +268,14 @@ class MotorMonitor:
                         actual_velocity=data.get("4a0402", 0),
                         phase_current=data.get("426201", 0),
                         voltage_logic=data.get("411001", 0),
-                        session=session,
-                        timestamp=timezone.now()
-                          # Assuming you want to record when it was inserted
-                    ) for data in data_points
+                        session_id=session_id,
+                        timestamp=datetime.fromtimestamp(timestamp, tz=timezone.utc)
+                    ) for timestamp, data in data_points
                 ]
 
                 # Use bulk_create for efficiency
                 created = ProtoData.objects.bulk_create(proto_data_objects)
+                update_rollups(session_id, "motor", proto_data_objects)
                 return len(created)
         except Exception as e:
             logger.error(f"Error bulk creating ProtoData: {e}")
@@ -317,23 +292,20 @@ class MotorMonitor:
                 logger.info("[DBW] Stop event set, skipping database write")
                 return
                 
-            # Get user and session (using cached values if available)
-            _, session = await self._get_user_and_session()
-
-            if not session:
-                logger.error("Cannot write to database: No active session")
+            if self.session_id is None:
+                logger.error("Cannot write to database: Recording is not bound to a session")
                 return
 
             # Extract data points from buffer
-            data_points = [item['data'] for item in self.data_buffer]
+            data_points = [(item['timestamp'], item['data']) for item in self.data_buffer]
 
             # Bulk create in database
-            num_created = await self._bulk_create_proto_data(data_points, session)
+            num_created = await self._bulk_create_proto_data(data_points, self.session_id)
 
             if num_created > 0:
                 # Clear buffer after successful write
                 self.data_buffer.clear()
-                logger.info(f"[DBW] Successfully wrote {num_created} data points to database") # Added Tag
+                logger.debug("[DBW] Successfully wrote %d data points to database", num_created)
             else:
                 logger.warning("[DBW] No data points written to database.")  # Added Tag, in case of failure
 
@@ -345,21 +317,32 @@ class MotorMonitor:
         except Exception as db_error:
             logger.error(f"[DBW] Error writing to database: {db_error}")  # Added Tag
 
-    async def logging_bool_on(self, textdata):
-        self.user_id = textdata["message"]
-    
-         # First check if there's an active session before enabling logging
-        ser, session = await self._get_user_and_session()
-    
-        if not session:
-            logger.warning(f"Cannot enable logging: No active session for user {self.user_id}")
-            return False  # Return False to indicate logging wasn't enabled
+    async def bind_session(self, session_id):
+        """Record into session_id; data buffered for a previous session is written there first"""
+        if self.session_id is not None and self.session_id != session_id:
+            await self.write_buffered_data_to_db()
+            self.data_buffer.clear()
+        self.session_id = session_id
         self.logging_bool = True
         self.websocket_send_counter = 0
-        logger.info(f"Logging enabled for user {self.user_id}")
-        return True  # Return True to indicate logging was enabled
+        logger.info(f"Logging bound to session {session_id}")
 
-        
+    async def unbind_session(self, session_id=None):
+        """Flush and stop recording; with a session_id only if that is the bound session"""
+        if session_id is not None and session_id != self.session_id:
+            return
+        await self.logging_bool_off()
+
+    async def logging_bool_on(self, textdata):
+        """Websocket 'start_logging': bind to the active session of the user in textdata["message"]"""
+        user_id = textdata["message"]
+        session_id = await self._get_active_session_id(user_id)
+
+        if session_id is None:
+            logger.warning(f"Cannot enable logging: No active session for user {user_id}")
+            return False  # Return False to indicate logging wasn't enabled
+        await self.bind_session(session_id)
+        return True  # Return True to indicate logging was enabled
 
     async def logging_bool_off(self):
         # Write any remaining data before turning off logging
@@ -367,4 +350,5 @@ class MotorMonitor:
             await self.write_buffered_data_to_db()
 
         self.logging_bool = False
-        logger.info("Logging disabled")
\ No newline at end of file
+        self.session_id = None
+        logger.info("Logging disabled")
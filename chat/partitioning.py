@@ -0,0 +1,106 @@
+# File: chat/partitioning.py
+# Monthly range partitions of the telemetry tables on PostgreSQL.
+#
+# Migration 0005 turns chat_protodata and chat_sensordata into tables
+# partitioned by "timestamp". One partition holds one calendar month, and
+# a DEFAULT partition catches rows no monthly partition covers. The
+# partition_telemetry command creates upcoming months and detaches old ones.
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("chat_protodata", "chat_sensordata")
+PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+# Telemetry is written after its session starts. The slack also covers
+# end_time values that older versions stored as naive local time.
+SESSION_WINDOW_SLACK = timedelta(days=1)
+
+
+def is_supported(connection):
+    return connection.vendor == "postgresql"
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table, month):
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name):
+    """The month a partition covers, or None for the default partition"""
+    match = PARTITION_NAME.search(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+    return cursor.fetchone() is not None
+
+
+def list_partitions(cursor, table):
+    """[(name, bound expression, estimated rows)] of the attached partitions"""
+    cursor.execute("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples::bigint
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        ORDER BY child.relname
+    """, [table])
+    return cursor.fetchall()
+
+
+def ensure_month_partition(cursor, table, month):
+    """Create the partition of month unless it exists; returns True if it was created.
+
+    Rows of that month that already landed in the default partition are
+    moved into the new partition, since PostgreSQL refuses to create a
+    partition whose range overlaps rows in the default partition.
+    """
+    name = partition_name(table, month)
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0] is not None:
+        return False
+
+    start, end = month, add_months(month, 1)
+    default = f"{table}_default"
+    cursor.execute(f'SELECT 1 FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s LIMIT 1', [start, end])
+    if cursor.fetchone() is None:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)", [start, end])
+        return True
+
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)", [start, end])
+    cursor.execute(f'INSERT INTO {name} SELECT * FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s',
+                   [start, end])
+    cursor.execute(f'DELETE FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s', [start, end])
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+    logger.info(f"Moved {month:%Y-%m} rows of {table} out of the default partition")
+    return True
+
+
+def detach_partition(cursor, table, name, drop=False):
+    """Detach a monthly partition; the detached table can be archived (pg_dump) and dropped"""
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+    if drop:
+        cursor.execute(f"DROP TABLE {name}")
+
+
+def session_window(session):
+    """timestamp filters that limit a session's telemetry query to the partitions it can be in"""
+    window = {"timestamp__gte": session.start_time - SESSION_WINDOW_SLACK}
+    if session.end_time is not None:
+        window["timestamp__lt"] = session.end_time + SESSION_WINDOW_SLACK
+    return window
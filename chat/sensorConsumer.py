@@ -1,10 +1,10 @@
 # File: sensor_control/consumer.py
 # Main WebSocket consumer for sensor data coordination
-import asyncio
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
-from .sensorcontrol.sensorMonitor import SensorMonitor
+from .clientSender import ClientSender
+from .acquisitionSupervisor import ensure_acquisition_started
 
 logger = logging.getLogger(__name__)
 
@@ -12,12 +12,21 @@ class SensorConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.room_group_name = 'sensor_control'
-        self.stop_event = asyncio.Event()
-        
-        # Initialize sensor monitor
-        self.monitor = None
-        self.current_sensor_values = {}
-        self.sensor_task = None
+
+        # The sensor monitor belongs to the acquisition supervisor
+        self.supervisor = None
+
+        # Outbound queue so slow clients never block the sensor loop
+        self.sender = ClientSender(self.send_text)
+
+    @property
+    def monitor(self):
+        # Looked up on every use: the supervisor replaces the monitor when it restarts it
+        return self.supervisor.sensor_monitor
+
+    @property
+    def current_sensor_values(self):
+        return self.monitor.sensor_data
 
     async def connect(self):
         # Add channel to group
@@ -26,64 +35,35 @@ class SensorConsumer(AsyncWebsocketConsumer):
             self.channel_name 
         )
 
-        # Initialize sensor monitor
-        self.monitor = SensorMonitor(
-            self.send_sensor_value, 
-            self.send_response,
-            self.stop_event
-        )
-        
-        # Start background sensor monitoring task
-        self.sensor_task = asyncio.create_task(self.monitor.listen_for_sensor_data())
-        
-        # Store current sensor values reference
-        self.current_sensor_values = self.monitor.sensor_data
+        # Attach to the long-lived acquisition, starting it if this is the first client
+        self.supervisor = await ensure_acquisition_started()
 
         # Accept the websocket connection
         await self.accept()
+        self.sender.start()
+        self.supervisor.attach("sensor", self.send_frame)
         
         # Send initial connection confirmation
         await self.send_response({
             "type": "sensor_connection", 
             "status": "connected",
-            "message": "Sensor monitoring started"
+            "message": "Attached to sensor monitoring"
         })
 
     async def disconnect(self, close_code):
         logger.info(f"Sensor consumer disconnecting with code: {close_code}")
         
-        # Set stop event to halt sensor monitoring
-        self.stop_event.set()
-
-        # Properly shutdown sensor monitoring
-        if self.sensor_task and not self.sensor_task.done():
-            try:
-                # Wait for the sensor task to complete gracefully
-                await asyncio.wait_for(self.sensor_task, timeout=2.0)
-            except asyncio.TimeoutError:
-                logger.warning("Sensor task didn't complete within timeout, cancelling")
-                self.sensor_task.cancel()
-                try:
-                    await self.sensor_task
-                except asyncio.CancelledError:
-                    pass
-            except Exception as e:
-                logger.error(f"Error during sensor task shutdown: {e}")
-
-        # Final cleanup for monitor
-        if self.monitor:
-            try:
-                # Turn off logging and flush any remaining data
-                if self.monitor.logging_bool:
-                    await self.monitor.logging_bool_off()
-            except Exception as e:
-                logger.error(f"Error during monitor cleanup: {e}")
+        # Acquisition and logging keep running in the supervisor
+        if self.supervisor:
+            self.supervisor.detach("sensor", self.send_frame)
                 
         # Remove from channel group
         try:
             await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
         except Exception as e:
             logger.error(f"Error removing from channel group: {e}")
+
+        await self.sender.stop()
         
         logger.info(f"Sensor consumer disconnected with code: {close_code}")
 
@@ -98,7 +78,7 @@ class SensorConsumer(AsyncWebsocketConsumer):
                     await self.send_response({
                         "type": "sensor_logging_status", 
                         "status": "started",
-                        "sensor_id": self.monitor.current_sensor_id
+                        "session_id": self.monitor.session_id
                     })
                 else:
                     await self.send_response({
@@ -132,6 +112,25 @@ class SensorConsumer(AsyncWebsocketConsumer):
                     "last_data": self.monitor.get_current_sensor_data()
                 })
                 
+            elif message_type == 'get_node_stats':
+                await self.send_response({
+                    "type": "sensor_node_stats",
+                    "nodes": self.monitor.get_node_stats()
+                })
+
+            elif message_type == 'set_max_rate':
+                try:
+                    self.sender.set_max_rate(text_data_json.get('max_rate'))
+                    await self.send_response({"type": "stream_stats", **self.sender.get_stats()})
+                except ValueError as e:
+                    await self.send_response({"type": "error", "message": str(e)})
+
+            elif message_type == 'get_stream_stats':
+                await self.send_response({"type": "stream_stats", **self.sender.get_stats()})
+
+            elif message_type == 'get_acquisition_status':
+                await self.send_response({"type": "acquisition_status", **self.supervisor.get_status()})
+
             elif message_type == 'calibrate_sensors':
                 # Placeholder for sensor calibration functionality
                 await self.send_response({
@@ -166,14 +165,21 @@ class SensorConsumer(AsyncWebsocketConsumer):
         )
 
     async def send_response(self, message):
-        """Send response directly to this consumer"""
-        await self.send(text_data=json.dumps(message))
+        """Queue a response for this consumer"""
+        self.sender.send_message(message)
+
+    async def send_frame(self, frame):
+        """Sensor frames from the monitor; conflated when the client falls behind"""
+        self.sender.send_frame(frame)
+
+    async def send_text(self, text):
+        await self.send(text_data=text)
 
     async def sensor_value(self, event):
         """Handle sensor value events from the group"""
         key = event['key']
         value = event['value']
-        await self.send(text_data=json.dumps({
+        self.sender.send_message({
             'type': key,
             'value': value,
-        }))
\ No newline at end of file
+        })
\ No newline at end of file
@@ -0,0 +1,112 @@
+# sensor_control/config.py
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+SMBUS_BLOCK_MAX = 32  # bytes per SMBus block read
+
+@dataclass
+class SensorNodeConfig:
+    """Configuration for a single I2C sensor node (one Arduino)"""
+    name: str
+    address: int
+    node_id: int  # compact id stored in the database
+    bus: int = 2  # I2C-Bus 2 for Orange Pi 5 Plus
+    struct_format: str = '<fHf'
+    field_names: Tuple[str, ...] = ('gewicht', 'touchstatus', 'griffhoehe')
+    read_interval: float = 0.05
+    frames_per_read: int = 1  # >1 if the node buffers frames for block reads
+    precision: Dict[str, int] = field(default_factory=lambda: {'gewicht': 2, 'griffhoehe': 1})
+
+    def __post_init__(self):
+        # A frame must fit into one SMBus block read, or read_size would be 0
+        if not 0 < self.frame_size <= SMBUS_BLOCK_MAX:
+            raise ValueError(f"Sensor node {self.name}: frame of {self.frame_size} bytes "
+                             f"({self.struct_format!r}) must be 1 to {SMBUS_BLOCK_MAX} bytes")
+        if len(self.field_names) != len(struct.unpack(self.struct_format, bytes(self.frame_size))):
+            raise ValueError(f"Sensor node {self.name}: {len(self.field_names)} field names "
+                             f"for struct format {self.struct_format!r}")
+        if self.frames_per_read < 1:
+            raise ValueError(f"Sensor node {self.name}: frames_per_read must be at least 1")
+
+    @property
+    def frame_size(self) -> int:
+        """Number of bytes the node sends per frame"""
+        return struct.calcsize(self.struct_format)
+
+    @property
+    def read_size(self) -> int:
+        """Number of bytes requested per I2C transaction (SMBus block limit is 32)"""
+        return min(self.frame_size * self.frames_per_read,
+                   SMBUS_BLOCK_MAX // self.frame_size * self.frame_size)
+
+    def key(self, field_name: str) -> str:
+        """Name of a field in the sensor data dict, e.g. gewicht_A2"""
+        return f"{field_name}_{self.name}"
+
+
+@dataclass
+class SensorFilterConfig:
+    """One stage of a field's filter chain (see sensorcontrol/signalFilters.py)"""
+    kind: str  # "ema", "median", "one_euro" or "spike"
+    params: Dict[str, float] = field(default_factory=dict)
+
+
+class SensorMonitorConfig:
+    """Centralized configuration for sensor monitoring"""
+
+    # Registered sensor nodes. Nodes on different buses are read concurrently.
+    NODE_CONFIGS = {
+        "A2": SensorNodeConfig(
+            name="A2",
+            address=0x08,
+            node_id=2
+        ),
+        "A3": SensorNodeConfig(
+            name="A3",
+            address=0x10,
+            node_id=3
+        ),
+    }
+
+    # Streaming filters per field name, applied to every node that has the field
+    FILTER_CONFIGS: Dict[str, List[SensorFilterConfig]] = {
+        "gewicht": [
+            SensorFilterConfig("spike", {"max_jump": 50.0, "max_rejects": 3}),
+            SensorFilterConfig("one_euro", {"min_cutoff": 1.0, "beta": 0.05}),
+        ],
+        "griffhoehe": [
+            SensorFilterConfig("median", {"window": 5}),
+        ],
+    }
+
+    # Store filtered values (True) or the raw readings (False)
+    FILTER_BEFORE_STORAGE = True
+
+    # Value ranges used when no I2C hardware is available
+    SIMULATION_RANGES = {
+        "gewicht": (0.0, 150.0),
+        "touchstatus": (0, 4095),  # 12-bit value
+        "griffhoehe": (5.0, 60.0),
+    }
+
+    @classmethod
+    def get_node_config(cls, name: str) -> Optional[SensorNodeConfig]:
+        """Retrieve a specific node configuration"""
+        return cls.NODE_CONFIGS.get(name)
+
+    @classmethod
+    def get_node_config_by_id(cls, node_id: int) -> Optional[SensorNodeConfig]:
+        """Retrieve a node configuration by its database id"""
+        return next((node for node in cls.NODE_CONFIGS.values() if node.node_id == node_id), None)
+
+    @classmethod
+    def get_key_node_bits(cls) -> Dict[str, int]:
+        """SensorData.nodes bit of every sensor data key, e.g. gewicht_A2 -> 1 << 2"""
+        return {node.key(field_name): 1 << node.node_id
+                for node in cls.NODE_CONFIGS.values() for field_name in node.field_names}
+
+    @classmethod
+    def get_all_node_configs(cls) -> Dict[str, SensorNodeConfig]:
+        """Get all node configurations"""
+        return cls.NODE_CONFIGS
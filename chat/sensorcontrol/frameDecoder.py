@@ -0,0 +1,44 @@
+# sensor_control/frameDecoder.py
+# Decodes buffers of back-to-back sensor frames column-wise
+import logging
+import struct
+
+# Try to import numpy, fall back to struct.iter_unpack if not available
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not available, decoding sensor frames with struct")
+
+_dtype_cache = {}
+
+
+def frame_dtype(node):
+    """NumPy structured dtype matching a node's struct layout, e.g. '<fHf'"""
+    key = (node.struct_format, node.field_names)
+    dtype = _dtype_cache.get(key)
+    if dtype is None:
+        byte_order = node.struct_format[0] if node.struct_format[0] in '<>=!@' else '='
+        codes = node.struct_format.lstrip('<>=!@')
+        # numpy has no network ('!') or aligned native ('@') prefix
+        byte_order = {'!': '>', '@': '='}.get(byte_order, byte_order)
+        dtype = np.dtype([(name, byte_order + code) for name, code in zip(node.field_names, codes)])
+        _dtype_cache[key] = dtype
+    return dtype
+
+
+def decode_frames(node, buffer):
+    """Decode a buffer holding whole frames into {field_name: column}"""
+    if NUMPY_AVAILABLE:
+        frames = np.frombuffer(buffer, dtype=frame_dtype(node))
+        return {name: frames[name] for name in node.field_names}
+    columns = list(zip(*struct.iter_unpack(node.struct_format, buffer)))
+    if not columns:
+        columns = [()] * len(node.field_names)
+    return dict(zip(node.field_names, columns))
+
+
+def to_python(value):
+    """Convert a numpy scalar to the matching Python type (JSON/ORM friendly)"""
+    return value.item() if hasattr(value, 'item') else value
@@ -4,11 +4,20 @@ import time
 import struct
 import random
 from collections import deque
-from django.utils import timezone
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
 from django.db import transaction
 
-from ..models import SensorData, BaseUser, ProtoSession
-from asgiref.sync import sync_to_async
+from ..models import SensorData, TouchEvent
+from .config import SensorMonitorConfig
+from .frameDecoder import decode_frames, to_python
+from .touchDetector import TouchEdgeDetector
+from .signalFilters import FilterChain
+from ..telemetryDatabase import telemetry_db_to_async
+from ..telemetryHub import telemetry_hub
+from ..telemetryRollups import update_rollups
+from ..activeSessions import get_active_session_id
 
 # Try to import smbus2, fall back to simulation if not available
 try:
@@ -20,46 +29,95 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class SensorNodeStats:
+    """Health and latency counters for one sensor node"""
+    reads: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_latency_ms: float = 0.0
+    avg_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    last_read_time: float = 0.0
+
+    def record_read(self, latency_ms, read_time):
+        self.reads += 1
+        self.consecutive_failures = 0
+        self.last_latency_ms = latency_ms
+        self.avg_latency_ms += (latency_ms - self.avg_latency_ms) / self.reads
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self.last_read_time = read_time
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+
+
 class SensorMonitor:
-    def __init__(self, send_sensor_value_callback, send_response_callback, stop_event):
+    def __init__(self, send_sensor_value_callback, send_response_callback, stop_event, nodes=None):
         self.send_sensor_value = send_sensor_value_callback
         self.send_response = send_response_callback
         self.stop_event = stop_event
         self.logging_bool = False
-        self.user_id = 0
+        self.session_id = None  # ProtoSession the recording is bound to
         self.previous_sensor_data = {}
-        
-        # I2C configuration
-        if HARDWARE_AVAILABLE:
-            try:
-                self.bus = smbus2.SMBus(2)  # I2C-Bus 2 for Orange Pi 5 Plus
-                self.hardware_mode = True
-            except Exception as e:
-                logger.warning(f"Failed to initialize I2C bus: {e}. Using simulation mode.")
-                self.hardware_mode = False
-        else:
-            self.hardware_mode = False
-            
-        # Sensor addresses from demo script
-        self.A2_ADDR = 0x08  # Arduino 2
-        self.A3_ADDR = 0x10  # Arduino 3
-        
-        # Current sensor data storage
+
+        # Sensor nodes from the registry (see sensorcontrol/config.py)
+        self.nodes = nodes if nodes is not None else SensorMonitorConfig.get_all_node_configs()
+        self.node_stats = {name: SensorNodeStats() for name in self.nodes}
+
+        # I2C configuration: one SMBus and one single-thread executor per bus,
+        # so reads on a bus stay serialized while separate buses run concurrently
+        self.buses = {}
+        self.bus_executors = {}
+        for bus_number in sorted({node.bus for node in self.nodes.values()}):
+            self.bus_executors[bus_number] = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"i2c-{bus_number}")
+            if HARDWARE_AVAILABLE:
+                try:
+                    self.buses[bus_number] = smbus2.SMBus(bus_number)
+                except Exception as e:
+                    logger.warning(f"Failed to initialize I2C bus {bus_number}: {e}. Using simulation mode.")
+        self.hardware_mode = bool(self.buses)
+        self.simulated_touch = {}  # address -> last simulated electrode bitmask
+
+        # Current sensor data storage (filtered) and the unfiltered readings
         self.sensor_data = {}
-        
-        # Both sensors are always active
-        self.sensor_ids = ['A2', 'A3']
+        self.raw_sensor_data = {}
+
+        # Streaming filter chains per node and field, applied before sending
+        self.filter_chains = {
+            name: {field_name: FilterChain.from_config(SensorMonitorConfig.FILTER_CONFIGS[field_name])
+                   for field_name in node.field_names if field_name in SensorMonitorConfig.FILTER_CONFIGS}
+            for name, node in self.nodes.items()
+        }
+        self.filter_before_storage = SensorMonitorConfig.FILTER_BEFORE_STORAGE
+
+        # Raw frames read since the last send, decoded together per node
+        self.pending_frames = {name: bytearray() for name in self.nodes}
+        self.pending_times = {name: [] for name in self.nodes}
+
+        # SensorData columns filled from the node fields, in buffer tuple order
+        model_fields = {f.name for f in SensorData._meta.get_fields()}
+        self.db_keys = [node.key(field_name) for node in self.nodes.values()
+                        for field_name in node.field_names if node.key(field_name) in model_fields]
+        self.db_key_node_bits = [1 << node.node_id for node in self.nodes.values()
+                                 for field_name in node.field_names if node.key(field_name) in model_fields]
+
+        # Touch edge detection on the MPR121 bitmasks of every node that reports them
+        self.touch_detectors = {name: TouchEdgeDetector() for name, node in self.nodes.items()
+                                if 'touchstatus' in node.field_names}
+        self.pending_touch_events = []  # sent with the next websocket message
+        self.touch_event_buffer = deque(maxlen=5000)  # (node_id, electrode, start, end) to store
+
+        # All registered nodes are always active
+        self.sensor_ids = list(self.nodes)
         
         # Database write configuration
         self.db_write_interval = 20 
         self.data_buffer = deque(maxlen=500) 
         
-        # Cache for user and session objects
-        self.user_cache = None
-        self.session_cache = None
-        self.last_cache_update = 0
-        self.cache_ttl = 60  # Cache TTL in seconds
-        
         # Websocket send configuration
         self.last_websocket_send_time = time.time()
         self.websocket_send_interval = 0.1  # Send every 100ms (sensors are slower than motor)
@@ -69,11 +127,12 @@ class SensorMonitor:
         self.websocket_send_counter = 0 
         self.db_write_flag = False 
 
-    def read_floats(self, addr, length):
+    def read_floats(self, addr, length, bus_number=2):
         """Read float data from I2C sensor or simulate data"""
-        if self.hardware_mode:
+        bus = self.buses.get(bus_number)
+        if bus is not None:
             try:
-                data = self.bus.read_i2c_block_data(addr, 0, length)
+                data = bus.read_i2c_block_data(addr, 0, length)
                 return bytes(data)
             except Exception as e:
                 logger.error(f"I2C read error at address {hex(addr)}: {e}")
@@ -84,26 +143,141 @@ class SensorMonitor:
     
     def simulate_sensor_data(self, addr, length):
         """Simulate sensor data for testing purposes"""
-        if addr == self.A2_ADDR and length == 10:
-            # Simulate Arduino A2 sensor data (gewicht, touchstatus, griffhoehe)
-            gewicht_A2 = random.uniform(0.0, 150.0)
-            touchstatus_A2 = random.randint(0, 4095)  # 12-bit value
-            griffhoehe_A2 = random.uniform(5.0, 60.0)
-            return struct.pack('<fHf', gewicht_A2, touchstatus_A2, griffhoehe_A2)
-        elif addr == self.A3_ADDR and length == 10:
-            # Simulate Arduino A3 sensor data (gewicht, touchstatus, griffhoehe)
-            gewicht_A3 = random.uniform(0.0, 150.0)
-            touchstatus_A3 = random.randint(0, 4095)  # 12-bit value
-            griffhoehe_A3 = random.uniform(5.0, 60.0)
-            return struct.pack('<fHf', gewicht_A3, touchstatus_A3, griffhoehe_A3)
-        else:
-            # Return zeros for unknown addresses
-            return bytes(length)
+        for node in self.nodes.values():
+            if node.address == addr and length % node.frame_size == 0:
+                frames = bytearray()
+                for _ in range(length // node.frame_size):
+                    values = []
+                    for field_name, code in zip(node.field_names, node.struct_format.lstrip('<>=!@')):
+                        low, high = SensorMonitorConfig.SIMULATION_RANGES.get(field_name, (0, 0))
+                        if field_name == 'touchstatus':
+                            # Touches change rarely; toggle one electrode now and then
+                            mask = self.simulated_touch.get(addr, 0)
+                            if random.random() < 0.05:
+                                mask ^= 1 << random.randrange(12)
+                            self.simulated_touch[addr] = mask
+                            values.append(mask)
+                        elif code in 'fd':
+                            values.append(random.uniform(low, high))
+                        else:
+                            values.append(random.randint(int(low), int(high)))
+                    frames += struct.pack(node.struct_format, *values)
+                return bytes(frames)
+        # Return zeros for unknown addresses
+        return bytes(length)
+
+    def read_node(self, node):
+        """Read one block of raw frames from a sensor node (runs in the bus executor)"""
+        stats = self.node_stats[node.name]
+        started = time.perf_counter()
+        raw = self.read_floats(node.address, node.read_size, node.bus)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if not raw or len(raw) != node.read_size:
+            stats.record_failure()
+            if stats.consecutive_failures == 1:
+                logger.warning(f"Failed to read Arduino {node.name} data")
+            return None
+
+        stats.record_read(latency_ms, time.time())
+        return raw
+
+    def latest_values(self, node, columns):
+        """Last decoded sample of a node as a {key: value} dict with display rounding"""
+        node_data = {}
+        for field_name, column in columns.items():
+            value = to_python(column[-1])
+            digits = node.precision.get(field_name)
+            node_data[node.key(field_name)] = round(value, digits) if digits is not None else value
+        return node_data
+
+    def drain_pending_frames(self):
+        """Decode all frames read since the last call, one vectorized pass per node.
+
+        Every sample goes through touch detection and the filter chains, whose
+        state depends on the full signal; self.raw_sensor_data and
+        self.sensor_data then hold the newest sample of each node, which is
+        what gets sent and stored.
+        """
+        for name, node in self.nodes.items():
+            buffer = self.pending_frames[name]
+            if not buffer:
+                continue
+            columns = decode_frames(node, bytes(buffer))
+            timestamps = self.pending_times[name]
+            buffer.clear()
+            self.pending_times[name] = []
+            self.raw_sensor_data.update(self.latest_values(node, columns))
+            self.detect_touch_events(node, timestamps, columns)
+            columns = self.filter_columns(name, timestamps, columns)
+            self.sensor_data.update(self.latest_values(node, columns))
+
+    def filter_columns(self, node_name, timestamps, columns):
+        """Run every sample of a decoded block through the node's filter chains"""
+        chains = self.filter_chains.get(node_name)
+        if not chains:
+            return columns
+        filtered = dict(columns)
+        for field_name, chain in chains.items():
+            filtered[field_name] = [chain.update(float(value), timestamp)
+                                    for value, timestamp in zip(columns[field_name], timestamps)]
+        return filtered
+
+    def detect_touch_events(self, node, timestamps, columns):
+        """Run touch edge detection on a decoded block of one node"""
+        detector = self.touch_detectors.get(node.name)
+        if detector is None:
+            return
+        touched, released = detector.feed(timestamps, columns['touchstatus'])
+        for electrode, start in touched:
+            self.pending_touch_events.append(
+                {'node': node.name, 'electrode': electrode, 'state': 'on', 'time': start})
+        for electrode, start, end in released:
+            self.pending_touch_events.append(
+                {'node': node.name, 'electrode': electrode, 'state': 'off', 'time': end})
+            if self.logging_bool:
+                self.touch_event_buffer.append((node.node_id, electrode, start, end))
+
+    def close_open_touches(self):
+        """Store touches that are still open, e.g. when logging stops"""
+        now = time.time()
+        for name, detector in self.touch_detectors.items():
+            node_id = self.nodes[name].node_id
+            for electrode, start, end in detector.close_open_touches(now):
+                self.touch_event_buffer.append((node_id, electrode, start, end))
+
+    async def poll_node(self, node):
+        """Read a single node on its own schedule"""
+        loop = asyncio.get_running_loop()
+        executor = self.bus_executors[node.bus]
+        next_read = loop.time()
+        while not self.stop_event.is_set():
+            try:
+                raw = await loop.run_in_executor(executor, self.read_node, node)
+                if raw:
+                    self.pending_frames[node.name] += raw
+                    read_time = self.node_stats[node.name].last_read_time
+                    self.pending_times[node.name].extend([read_time] * (len(raw) // node.frame_size))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.node_stats[node.name].record_failure()
+                logger.error(f"Error reading sensor node {node.name}: {e}")
+
+            # Keep a fixed rate; skip missed slots instead of bursting
+            next_read += node.read_interval
+            now = loop.time()
+            if next_read < now:
+                next_read = now
+            await asyncio.sleep(next_read - now)
 
     async def listen_for_sensor_data(self):
-        """Main sensor data reading loop"""
+        """Main sensor data loop: node readers feed self.sensor_data, this loop sends and stores it"""
+        node_tasks = []
         try:
             loop = asyncio.get_event_loop()
+            node_tasks = [asyncio.create_task(self.poll_node(node)) for node in self.nodes.values()]
+            telemetry_hub.register_producer("sensor", self)
             
             while not self.stop_event.is_set():
                 try:
@@ -111,17 +285,14 @@ class SensorMonitor:
                     if loop.is_closed():
                         logger.info("Event loop is closed, stopping sensor monitoring")
                         break
-                        
-                    # Read sensor data in executor to avoid blocking
-                    sensor_data = await loop.run_in_executor(None, self.read_all_sensors)
                     
-                    if sensor_data and not self.stop_event.is_set():
-                        # Update internal sensor data storage
-                        self.sensor_data.update(sensor_data)
-                        
-                        # Check if it's time to send data to websocket
-                        current_time = time.time()
-                        if current_time - self.last_websocket_send_time >= self.websocket_send_interval:
+                    # Check if it's time to send data to websocket
+                    current_time = time.time()
+                    if (not self.stop_event.is_set() and
+                            current_time - self.last_websocket_send_time >= self.websocket_send_interval):
+                        # Decode everything the node readers collected since the last send
+                        self.drain_pending_frames()
+                        if self.sensor_data:
                             
                             # Create a copy of the sensor data for this websocket send
                             sensor_data_copy = self.sensor_data.copy()
@@ -134,6 +305,7 @@ class SensorMonitor:
                             # Format data and send (only if not stopping)
                             if not self.stop_event.is_set():
                                 formatted_data = self.format_sensor_data_for_websocket(sensor_data_copy, dbw_flag, current_time)
+                                telemetry_hub.publish("sensor", formatted_data)
                                 await self.send_response(formatted_data)
                             
                             # Increment counter
@@ -141,7 +313,11 @@ class SensorMonitor:
                             
                             # Write to DB if needed
                             if self.logging_bool and self.websocket_send_counter % self.db_write_frequency == 0:
-                                self.data_buffer.append({'data': sensor_data_copy})
+                                stored_data = sensor_data_copy if self.filter_before_storage else self.raw_sensor_data
+                                self.data_buffer.append((
+                                    current_time,
+                                    tuple(stored_data.get(key) for key in self.db_keys)
+                                ))
                                 self.db_write_flag = True
                             
                             self.last_websocket_send_time = current_time
@@ -151,7 +327,7 @@ class SensorMonitor:
                         await self.write_buffered_data_to_db()
                         self.db_write_flag = False
                     
-                    # Small delay to prevent overwhelming the I2C bus
+                    # Node readers run independently; only wake up for the next send
                     await asyncio.sleep(0.05)  # 50ms delay
                     
                 except RuntimeError as e:
@@ -174,49 +350,33 @@ class SensorMonitor:
         except Exception as e:
             logger.error(f"Error in listen_for_sensor_data: {e}")
         finally:
+            telemetry_hub.unregister_producer("sensor", self)
+            for task in node_tasks:
+                task.cancel()
+            await asyncio.gather(*node_tasks, return_exceptions=True)
+            for executor in self.bus_executors.values():
+                executor.shutdown(wait=False)
             # Final cleanup - write any remaining buffered data
-            if self.data_buffer and self.logging_bool:
+            if (self.data_buffer or self.touch_event_buffer) and self.logging_bool:
                 try:
                     await self.write_buffered_data_to_db()
                 except Exception as e:
                     logger.error(f"Error writing final buffered data: {e}")
             logger.info("Sensor monitoring stopped")
 
-    def read_all_sensors(self):
-        """Read data from all sensors"""
-        sensor_data = {}
-        
-        try:
-            # Read Arduino A2 sensor data (10 bytes)
-            raw_a2 = self.read_floats(self.A2_ADDR, 10)
-            if raw_a2 and len(raw_a2) == 10:
-                gewicht_A2, touchstatus_A2, griffhoehe_A2 = struct.unpack('<fHf', raw_a2)
-                sensor_data.update({
-                    'gewicht_A2': round(gewicht_A2, 2),
-                    'touchstatus_A2': touchstatus_A2,
-                    'griffhoehe_A2': round(griffhoehe_A2, 1)
-                })
-                logger.debug(f"Arduino A2 → Weight: {gewicht_A2:.2f} N, Touch: {bin(touchstatus_A2)} ({touchstatus_A2}), Grip height: {griffhoehe_A2:.1f} cm")
-            else:
-                logger.warning("Failed to read Arduino A2 data")
-            
-            # Read Arduino A3 sensor data (10 bytes)
-            raw_a3 = self.read_floats(self.A3_ADDR, 10)
-            if raw_a3 and len(raw_a3) == 10:
-                gewicht_A3, touchstatus_A3, griffhoehe_A3 = struct.unpack('<fHf', raw_a3)
-                sensor_data.update({
-                    'gewicht_A3': round(gewicht_A3, 2),
-                    'touchstatus_A3': touchstatus_A3,
-                    'griffhoehe_A3': round(griffhoehe_A3, 1)
-                })
-                logger.debug(f"Arduino A3 → Weight: {gewicht_A3:.2f} N, Touch: {bin(touchstatus_A3)} ({touchstatus_A3}), Grip height: {griffhoehe_A3:.1f} cm")
-            else:
-                logger.warning("Failed to read Arduino A3 data")
-                
-        except Exception as e:
-            logger.error(f"Error reading sensor data: {e}")
-        
-        return sensor_data
+    def get_latest_values(self):
+        """Newest (filtered) values of all nodes and the age in seconds of the oldest node reading.
+
+        Decodes pending frames immediately, for control loops faster than the send interval.
+        """
+        self.drain_pending_frames()
+        read_times = [stats.last_read_time for stats in self.node_stats.values()]
+        age = time.time() - min(read_times) if read_times and min(read_times) else None
+        return self.sensor_data.copy(), age
+
+    def get_node_stats(self):
+        """Health and latency counters per sensor node"""
+        return {name: asdict(stats) for name, stats in self.node_stats.items()}
 
     def format_sensor_data_for_websocket(self, sensor_data, dbw_flag, timestamp):
         """Format sensor data for websocket transmission"""
@@ -229,48 +389,24 @@ class SensorMonitor:
         
         # Include all sensor data
         data.update(sensor_data)
+
+        # Touch edges detected since the last message
+        if self.pending_touch_events:
+            data['touch_events'] = self.pending_touch_events
+            self.pending_touch_events = []
         
         # Update previous values
         self.previous_sensor_data.update(sensor_data)
         
         return data
 
-    @sync_to_async
-    def _get_user_and_session(self):
-        """Get and cache user and session objects"""
-        # Check if we're in shutdown mode
-        if self.stop_event.is_set():
-            return None, None
-            
-        current_time = time.time()
-        
-        # Check if cache needs refresh
-        if (self.user_cache is None or self.session_cache is None or
-                current_time - self.last_cache_update > self.cache_ttl):
-            try:
-                user = BaseUser.objects.get(id=self.user_id)
-                session = ProtoSession.objects.filter(user=user, is_active=True).first()
-                
-                if session:
-                    self.user_cache = user
-                    self.session_cache = session
-                    self.last_cache_update = current_time
-                    return user, session
-                else:
-                    logger.error(f"No active sensor session found for user {self.user_id}")
-                    return None, None
-            except BaseUser.DoesNotExist:
-                logger.error(f"User with ID {self.user_id} does not exist")
-                return None, None
-            except Exception as e:
-                logger.error(f"Error getting user and session: {e}")
-                return None, None
-        else:
-            # Return cached values
-            return self.user_cache, self.session_cache
+    @telemetry_db_to_async("sensor")
+    def _get_active_session_id(self, user_id):
+        """Primary key of the user's active session, or None"""
+        return get_active_session_id(user_id)
 
-    @sync_to_async
-    def _bulk_create_sensor_data(self, data_points, session):
+    @telemetry_db_to_async("sensor")
+    def _bulk_create_sensor_data(self, data_points, session_id):
         """Bulk create SensorData objects"""
         # Check if we're in shutdown mode
         if self.stop_event.is_set():
@@ -278,33 +414,56 @@ class SensorMonitor:
             
         try:
             with transaction.atomic():
-                sensor_data_objects = [
-                    SensorData(
-                        # Arduino A2 data
-                        gewicht_A2=data['data'].get('gewicht_A2', 0.0),
-                        touchstatus_A2=data['data'].get('touchstatus_A2', 0),
-                        griffhoehe_A2=data['data'].get('griffhoehe_A2', 0.0),
-                        # Arduino A3 data
-                        gewicht_A3=data['data'].get('gewicht_A3', 0.0),
-                        touchstatus_A3=data['data'].get('touchstatus_A3', 0),
-                        griffhoehe_A3=data['data'].get('griffhoehe_A3', 0.0),
-                        # Metadata
-                        sensor_id='both',  # Both sensors are always recorded
-                        session=session,
-                        timestamp=timezone.now()
-                    ) for data in data_points
-                ]
+                # Buffer rows are (timestamp, values) with values ordered like self.db_keys;
+                # missing node values fall back to the model defaults and their node bit stays clear
+                sensor_data_objects = []
+                for timestamp, values in data_points:
+                    fields = {}
+                    nodes = 0
+                    for key, bit, value in zip(self.db_keys, self.db_key_node_bits, values):
+                        if value is not None:
+                            fields[key] = value
+                            nodes |= bit
+                    sensor_data_objects.append(SensorData(
+                        **fields,
+                        nodes=nodes,
+                        session_id=session_id,
+                        timestamp=datetime.fromtimestamp(timestamp, tz=timezone.utc)
+                    ))
                 
                 # Use bulk_create for efficiency
                 created = SensorData.objects.bulk_create(sensor_data_objects)
+                update_rollups(session_id, "sensor", sensor_data_objects)
                 return len(created)
         except Exception as e:
             logger.error(f"Error bulk creating SensorData: {e}")
             return 0
 
+    @telemetry_db_to_async("sensor")
+    def _bulk_create_touch_events(self, events, session_id):
+        """Bulk create TouchEvent objects"""
+        # Check if we're in shutdown mode
+        if self.stop_event.is_set():
+            return 0
+
+        try:
+            created = TouchEvent.objects.bulk_create([
+                TouchEvent(
+                    session_id=session_id,
+                    node=node_id,
+                    electrode=electrode,
+                    start=datetime.fromtimestamp(start, tz=timezone.utc),
+                    end=datetime.fromtimestamp(end, tz=timezone.utc)
+                ) for node_id, electrode, start, end in events
+            ])
+            return len(created)
+        except Exception as e:
+            logger.error(f"Error bulk creating TouchEvent: {e}")
+            return 0
+
     async def write_buffered_data_to_db(self):
         """Write buffered sensor data to database in bulk"""
-        if not self.data_buffer or not self.logging_bool:
+        if not (self.data_buffer or self.touch_event_buffer) or not self.logging_bool:
             return  # Nothing to write
         
         try:
@@ -313,23 +472,30 @@ class SensorMonitor:
                 logger.info("[SENSOR-DBW] Stop event set, skipping database write")
                 return
                 
-            # Get user and session (using cached values if available)
-            _, session = await self._get_user_and_session()
-            
-            if not session:
-                logger.error("Cannot write to database: No active sensor session")
+            if self.session_id is None:
+                logger.error("Cannot write to database: Recording is not bound to a session")
                 return
             
+            # Touch events are small and independent of the sample rows
+            if self.touch_event_buffer:
+                events = list(self.touch_event_buffer)
+                if await self._bulk_create_touch_events(events, self.session_id) > 0:
+                    for _ in events:
+                        self.touch_event_buffer.popleft()
+
+            if not self.data_buffer:
+                return
+
             # Extract data points from buffer
             data_points = list(self.data_buffer)
             
             # Bulk create in database
-            num_created = await self._bulk_create_sensor_data(data_points, session)
+            num_created = await self._bulk_create_sensor_data(data_points, self.session_id)
             
             if num_created > 0:
                 # Clear buffer after successful write
                 self.data_buffer.clear()
-                logger.info(f"[SENSOR-DBW] Successfully wrote {num_created} sensor data points to database")
+                logger.debug("[SENSOR-DBW] Successfully wrote %d sensor data points to database", num_created)
             else:
                 logger.warning("[SENSOR-DBW] No sensor data points written to database.")
                 
@@ -341,29 +507,46 @@ class SensorMonitor:
         except Exception as db_error:
             logger.error(f"[SENSOR-DBW] Error writing sensor data to database: {db_error}")
 
+    async def bind_session(self, session_id):
+        """Record into session_id; data buffered for a previous session is written there first"""
+        if self.session_id is not None and self.session_id != session_id:
+            self.close_open_touches()
+            await self.write_buffered_data_to_db()
+            self.data_buffer.clear()
+            self.touch_event_buffer.clear()
+        self.session_id = session_id
+        self.logging_bool = True
+        self.websocket_send_counter = 0
+        logger.info(f"Sensor logging bound to session {session_id}")
+
+    async def unbind_session(self, session_id=None):
+        """Flush and stop recording; with a session_id only if that is the bound session"""
+        if session_id is not None and session_id != self.session_id:
+            return
+        await self.logging_bool_off()
+
     async def logging_bool_on(self, textdata):
-        """Enable sensor data logging"""
-        self.user_id = textdata["message"]
-        
-        # First check if there's an active session before enabling logging
-        user, session = await self._get_user_and_session()
+        """Websocket 'start_sensor_logging': bind to the active session of the user in textdata["message"]"""
+        user_id = textdata["message"]
+        session_id = await self._get_active_session_id(user_id)
         
-        if not session:
-            logger.warning(f"Cannot enable sensor logging: No active session for user {self.user_id}")
+        if session_id is None:
+            logger.warning(f"Cannot enable sensor logging: No active session for user {user_id}")
             return False  # Return False to indicate logging wasn't enabled
         
-        self.logging_bool = True
-        self.websocket_send_counter = 0
-        logger.info(f"Sensor logging enabled for user {self.user_id}")
+        await self.bind_session(session_id)
         return True  # Return True to indicate logging was enabled
 
     async def logging_bool_off(self):
         """Disable sensor data logging"""
         # Write any remaining data before turning off logging
-        if self.data_buffer:
+        if self.logging_bool:
+            self.close_open_touches()
+        if self.data_buffer or self.touch_event_buffer:
             await self.write_buffered_data_to_db()
         
         self.logging_bool = False
+        self.session_id = None
         logger.info("Sensor logging disabled")
 
 
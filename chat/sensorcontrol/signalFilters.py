@@ -0,0 +1,135 @@
+# sensor_control/signalFilters.py
+# Streaming filters for sensor values. Every filter keeps constant-size state
+# and is updated one sample at a time with update(value, timestamp).
+import math
+from collections import deque
+
+
+class EmaFilter:
+    """Exponential moving average"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, value, timestamp):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+    def reset(self):
+        self.value = None
+
+
+class MedianFilter:
+    """Running median over a small fixed window"""
+
+    def __init__(self, window=5):
+        self.samples = deque(maxlen=window)
+
+    def update(self, value, timestamp):
+        self.samples.append(value)
+        ordered = sorted(self.samples)
+        middle = len(ordered) // 2
+        if len(ordered) % 2:
+            return ordered[middle]
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+    def reset(self):
+        self.samples.clear()
+
+
+class OneEuroFilter:
+    """1€ filter (Casiez et al. 2012): smooths strongly at rest, follows fast movements"""
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.derivative = 0.0
+        self.last_timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, value, timestamp):
+        if self.value is None:
+            self.value = value
+            self.last_timestamp = timestamp
+            return value
+
+        dt = timestamp - self.last_timestamp
+        if dt <= 0:
+            # Same read (block reads share a timestamp); assume the nominal rate
+            dt = 0.05
+        self.last_timestamp = timestamp
+
+        derivative = (value - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (derivative - self.derivative)
+        cutoff = self.min_cutoff + self.beta * abs(self.derivative)
+        self.value += self._alpha(cutoff, dt) * (value - self.value)
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.derivative = 0.0
+        self.last_timestamp = None
+
+
+class SpikeRejector:
+    """Holds the last value when a sample jumps by more than max_jump.
+
+    After max_rejects consecutive rejected samples the new level is accepted,
+    so real step changes still get through.
+    """
+
+    def __init__(self, max_jump=50.0, max_rejects=3):
+        self.max_jump = max_jump
+        self.max_rejects = max_rejects
+        self.value = None
+        self.rejected = 0
+
+    def update(self, value, timestamp):
+        if self.value is not None and abs(value - self.value) > self.max_jump and self.rejected < self.max_rejects:
+            self.rejected += 1
+            return self.value
+        self.rejected = 0
+        self.value = value
+        return value
+
+    def reset(self):
+        self.value = None
+        self.rejected = 0
+
+
+FILTER_TYPES = {
+    "ema": EmaFilter,
+    "median": MedianFilter,
+    "one_euro": OneEuroFilter,
+    "spike": SpikeRejector,
+}
+
+
+class FilterChain:
+    """Applies a list of filters in order"""
+
+    def __init__(self, filters):
+        self.filters = filters
+
+    @classmethod
+    def from_config(cls, filter_configs):
+        return cls([FILTER_TYPES[config.kind](**config.params) for config in filter_configs])
+
+    def update(self, value, timestamp):
+        for signal_filter in self.filters:
+            value = signal_filter.update(value, timestamp)
+        return value
+
+    def reset(self):
+        for signal_filter in self.filters:
+            signal_filter.reset()
@@ -0,0 +1,70 @@
+# sensor_control/touchDetector.py
+# Edge detection on MPR121 electrode bitmasks
+from .frameDecoder import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+ELECTRODE_COUNT = 12  # MPR121 has 12 electrodes
+
+
+class TouchEdgeDetector:
+    """Turns a stream of electrode bitmasks into touch-on/touch-off events.
+
+    feed() returns (touched, released): touched is a list of
+    (electrode, start) for electrodes that went on, released is a list of
+    (electrode, start, end) intervals that were completed.
+    """
+
+    def __init__(self, electrode_count=ELECTRODE_COUNT):
+        self.electrode_count = electrode_count
+        self.mask = 0
+        self.touch_start = {}  # electrode -> start timestamp of the open touch
+
+    def feed(self, timestamps, masks):
+        touched, released = [], []
+        for index in self._changed_indices(masks):
+            new_mask = int(masks[index])
+            self._apply(new_mask, timestamps[index], touched, released)
+        return touched, released
+
+    def _changed_indices(self, masks):
+        """Indices at which the mask differs from the previous sample"""
+        if len(masks) == 0:
+            return []
+        if NUMPY_AVAILABLE:
+            masks = np.asarray(masks)
+            previous = np.empty_like(masks)
+            previous[0] = self.mask
+            previous[1:] = masks[:-1]
+            return np.flatnonzero(masks != previous).tolist()
+        changed, previous = [], self.mask
+        for index, mask in enumerate(masks):
+            if mask != previous:
+                changed.append(index)
+            previous = mask
+        return changed
+
+    def _apply(self, new_mask, timestamp, touched, released):
+        rising = new_mask & ~self.mask
+        falling = self.mask & ~new_mask
+        for electrode in range(self.electrode_count):
+            bit = 1 << electrode
+            if rising & bit:
+                self.touch_start[electrode] = timestamp
+                touched.append((electrode, timestamp))
+            elif falling & bit:
+                start = self.touch_start.pop(electrode, None)
+                if start is not None:
+                    released.append((electrode, start, timestamp))
+        self.mask = new_mask
+
+    def close_open_touches(self, timestamp):
+        """Cut all open touches at timestamp (e.g. when logging stops).
+
+        Electrodes that are still touched continue as new touches starting at timestamp.
+        """
+        released = [(electrode, start, timestamp) for electrode, start in sorted(self.touch_start.items())]
+        for electrode in self.touch_start:
+            self.touch_start[electrode] = timestamp
+        return released
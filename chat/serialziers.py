@@ -44,6 +44,13 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["username","height","oberschenkellänge","unterschenkel","schuhgröße","oberkörper",
                   "armlänge","gewicht","geburtsdatum","geschlecht","sessioncount","rollstuhl","id"]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        # fields: optional subset of Meta.fields to serialize (sparse fieldsets, see Get_User)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def create(self, validated_data):
         user = BaseUser.objects.create_user(**validated_data)
         return user
@@ -0,0 +1,139 @@
+# File: chat/sessionAnalytics.py
+# Per-session metrics for comparing a user's sessions.
+#
+# Metrics come from one grouped aggregate query per telemetry table over
+# all requested sessions, not from fetching each session's rows. Finished
+# sessions keep their metrics in SessionSummary: they are stored when a
+# session is stopped or closed by starting a new one, by the
+# backfill_summaries command for older sessions, or on a user's first
+# metrics request; active sessions are always computed live.
+
+import logging
+
+from django.db.models import Avg, Count, F, Max, Min
+from django.db.models.functions import Abs
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import ProtoData, ProtoSession, SensorData, SessionSummary
+from .partitioning import SESSION_WINDOW_SLACK
+from .sensorcontrol.config import SensorMonitorConfig
+
+logger = logging.getLogger(__name__)
+
+METRIC_FIELDS = ("duration", "motor_samples", "sensor_samples", "peak_force_A2", "peak_force_A3",
+                 "position_min", "position_max", "mean_velocity")
+
+# Keeps the IN (...) list below SQLite's bound parameter limit
+SESSION_BATCH = 500
+
+
+def telemetry_window(sessions):
+    """timestamp filters covering all sessions, so PostgreSQL can skip unrelated partitions"""
+    window = {"timestamp__gte": min(session.start_time for session in sessions) - SESSION_WINDOW_SLACK}
+    if all(session.end_time is not None for session in sessions):
+        window["timestamp__lt"] = max(session.end_time for session in sessions) + SESSION_WINDOW_SLACK
+    return window
+
+
+def delivered(key):
+    """Condition for SensorData rows in which the node of key delivered a value (else it's the model default)"""
+    bit = SensorMonitorConfig.get_key_node_bits()[key]
+    return GreaterThan(F("nodes").bitand(bit), 0)
+
+
+def compute_metrics(sessions):
+    """{session_id: {metric: value}} of the sessions, with one grouped query per telemetry table"""
+    metrics = {}
+    for offset in range(0, len(sessions), SESSION_BATCH):
+        batch = sessions[offset:offset + SESSION_BATCH]
+        ids = [session.id for session in batch]
+        window = telemetry_window(batch)
+        now = timezone.now()
+        for session in batch:
+            metrics[session.id] = {
+                "duration": ((session.end_time or now) - session.start_time).total_seconds(),
+                "motor_samples": 0, "sensor_samples": 0,
+                "peak_force_A2": None, "peak_force_A3": None,
+                "position_min": None, "position_max": None, "mean_velocity": None,
+            }
+
+        motor = ProtoData.objects.filter(session_id__in=ids, **window).values("session_id").annotate(
+            motor_samples=Count("*"),
+            position_min=Min("actual_position"),
+            position_max=Max("actual_position"),
+            mean_velocity=Avg(Abs("actual_velocity")),
+        ).order_by()
+        sensor = SensorData.objects.filter(session_id__in=ids, **window).values("session_id").annotate(
+            sensor_samples=Count("*"),
+            peak_force_A2=Max("gewicht_A2", filter=delivered("gewicht_A2")),
+            peak_force_A3=Max("gewicht_A3", filter=delivered("gewicht_A3")),
+        ).order_by()
+        for rows in (motor, sensor):
+            for row in rows:
+                metrics[row.pop("session_id")].update(row)
+    return metrics
+
+
+def finished(session):
+    return not session.is_active and session.end_time is not None
+
+
+def store_summaries(metrics):
+    """Create or refresh the SessionSummary rows of {session_id: metrics}"""
+    SessionSummary.objects.bulk_create(
+        [SessionSummary(session_id=session_id, **values) for session_id, values in metrics.items()],
+        update_conflicts=True, unique_fields=["session"], update_fields=[*METRIC_FIELDS, "computed_at"],
+    )
+
+
+def summarize_sessions(sessions):
+    """Compute and store the metrics of the finished sessions among sessions"""
+    sessions = [session for session in sessions if finished(session)]
+    if sessions:
+        store_summaries(compute_metrics(sessions))
+        logger.info(f"Stored summaries of {len(sessions)} sessions")
+
+
+def summarize_session_ids(session_ids):
+    """summarize_sessions() by primary key, e.g. after sessions were closed with update()"""
+    try:
+        summarize_sessions(list(ProtoSession.objects.filter(pk__in=session_ids)))
+    except Exception as e:
+        # A missing summary is computed later; never fail the request that closed the session
+        logger.error(f"Error summarizing sessions {session_ids}: {e}")
+
+
+def session_metrics(user, session_ids=None):
+    """Metrics of the user's sessions (optionally only session_ids), oldest session first"""
+    sessions = ProtoSession.objects.filter(user=user).select_related("summary").order_by("start_time")
+    if session_ids is not None:
+        sessions = sessions.filter(id__in=session_ids)
+    sessions = list(sessions)
+
+    metrics = {}
+    for session in sessions:
+        summary = getattr(session, "summary", None)
+        # A summary older than end_time belongs to an earlier run of a reopened session
+        if summary is not None and finished(session) and summary.computed_at >= session.end_time:
+            metrics[session.id] = {field: getattr(summary, field) for field in METRIC_FIELDS}
+
+    missing = [session for session in sessions if session.id not in metrics]
+    if missing:
+        computed = compute_metrics(missing)
+        store_summaries({session.id: computed[session.id] for session in missing if finished(session)})
+        metrics.update(computed)
+
+    results = []
+    for session in sessions:
+        values = metrics[session.id]
+        position_min, position_max = values.get("position_min"), values.get("position_max")
+        results.append({
+            "session_id": session.id,
+            "start_time": session.start_time,
+            "end_time": session.end_time,
+            "is_active": session.is_active,
+            **values,
+            "range_of_motion": position_max - position_min if position_min is not None else None,
+        })
+    return results
@@ -0,0 +1,142 @@
+# File: chat/sessionDataCache.py
+# Cached JSON payloads of finished sessions, served with strong ETags.
+#
+# A session's telemetry no longer changes once it is stopped, so its
+# rendered payloads are kept in the "session_data" cache. Keys contain the
+# session's end_time: a session that is reopened and stopped again gets new
+# keys, even in processes whose local cache the signals below can't reach.
+# The per-session key lists only let those signals free memory early: if
+# one is evicted first, its payloads are unreachable anyway (new end_time,
+# or a deleted session that fails the ownership check) and age out of the
+# LRU like any other entry.
+#
+# LocMemCache only bounds the number of entries; BoundedLocMemCache also
+# bounds their total pickled size (OPTIONS MAX_BYTES).
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+SESSION_DATA_CACHE = "session_data"
+
+# Pickled size of every entry, per cache name; shared like LocMemCache's own store
+_sizes = {}
+
+
+class BoundedLocMemCache(LocMemCache):
+    """LocMemCache that evicts least recently used entries beyond MAX_BYTES in total"""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._max_bytes = int(params.get("OPTIONS", {}).get("MAX_BYTES", 64 * 1024 * 1024))
+        self._sizes = _sizes.setdefault(name, {})
+
+    def total_bytes(self):
+        return sum(self._sizes.values())
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        super()._set(key, value, timeout)
+        self._sizes[key] = len(value)
+        total = self.total_bytes()
+        # LocMemCache keeps the most recently used entry first
+        while total > self._max_bytes and len(self._cache) > 1:
+            evicted, _ = self._cache.popitem()
+            del self._expire_info[evicted]
+            total -= self._sizes.pop(evicted, 0)
+
+    def _cull(self):
+        super()._cull()
+        for key in [key for key in self._sizes if key not in self._cache]:
+            del self._sizes[key]
+
+    def _delete(self, key):
+        self._sizes.pop(key, None)
+        return super()._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._sizes.clear()
+
+
+def get_cache():
+    return caches[SESSION_DATA_CACHE]
+
+
+def index_key(session_id):
+    """Key of the list of cached payload keys of a session"""
+    return f"session_data:{session_id}:keys"
+
+
+def payload_key(session, fmt):
+    return f"session_data:{session.id}:{session.end_time.timestamp():.6f}:{fmt}"
+
+
+def _store(session, key, entry):
+    cache = get_cache()
+    cache.set(key, entry, timeout=None)
+    keys = cache.get(index_key(session.id)) or []
+    if key not in keys:
+        cache.set(index_key(session.id), keys + [key], timeout=None)
+
+
+def invalidate_session(session_id):
+    cache = get_cache()
+    keys = cache.get(index_key(session_id))
+    if keys:
+        cache.delete_many(keys + [index_key(session_id)])
+        logger.debug(f"Dropped {len(keys)} cached payloads of session {session_id}")
+
+
+def render(payload):
+    """JSON bytes of build()'s result; bytes are taken as already rendered JSON"""
+    return payload if isinstance(payload, bytes) else JSONRenderer().render(payload)
+
+
+def session_data_response(request, session, fmt, build):
+    """Response with the data build() returns; finished sessions are cached and answer If-None-Match with 304"""
+    if session.is_active or session.end_time is None:
+        payload = build()
+        if isinstance(payload, bytes):
+            return HttpResponse(payload, content_type="application/json")
+        return Response(payload)
+
+    key = payload_key(session, fmt)
+    entry = get_cache().get(key)
+    if entry is None:
+        body = render(build())
+        etag = quote_etag(hashlib.sha1(body).hexdigest())
+        entry = (etag, body)
+        if len(body) <= settings.SESSION_DATA_CACHE_MAX_BYTES:
+            _store(session, key, entry)
+    etag, body = entry
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    # Per-user data: browsers may keep it but must revalidate on every visit
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def session_saved(sender, instance, created, **kwargs):
+    if not created and instance.is_active:
+        invalidate_session(instance.id)
+
+
+def session_deleted(sender, instance, **kwargs):
+    invalidate_session(instance.id)
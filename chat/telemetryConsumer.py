@@ -0,0 +1,89 @@
+# File: chat/telemetryConsumer.py
+# Read-only WebSocket consumer for passive viewers. It only subscribes to
+# telemetry the monitors already produce: no socket, no pollers, no commands.
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+from channels.generic.websocket import AsyncWebsocketConsumer
+from .telemetryHub import telemetry_hub, TELEMETRY_SOURCES
+from .clientSender import ClientSender
+
+logger = logging.getLogger(__name__)
+
+class TelemetryConsumer(AsyncWebsocketConsumer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.subscription = None
+        self.forward_task = None
+        self.sender = ClientSender(self.send_text)
+
+    async def connect(self):
+        # ?sources=motor,sensor selects the streams, default is all of them
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        requested = query.get("sources", [",".join(TELEMETRY_SOURCES)])[0].split(",")
+        sources = [source for source in requested if source in TELEMETRY_SOURCES]
+        if not sources:
+            await self.close(code=4000)
+            return
+
+        try:
+            self.sender.set_max_rate(query.get("max_rate", [None])[0])
+        except ValueError as e:
+            await self.accept()
+            await self.send_text(json.dumps({"type": "error", "message": str(e)}))
+            await self.close(code=4000)
+            return
+
+        self.subscription = telemetry_hub.subscribe(sources)
+        await self.accept()
+        self.sender.start()
+        # Show the newest values right away instead of waiting for the next frame
+        for source in sources:
+            frame = telemetry_hub.get_latest(source)
+            if frame is not None:
+                self.sender.send_frame({**frame, "source": source}, key=source)
+        self.forward_task = asyncio.create_task(self.forward_telemetry())
+
+    async def disconnect(self, close_code):
+        if self.subscription:
+            self.subscription.close()
+        if self.forward_task and not self.forward_task.done():
+            self.forward_task.cancel()
+            try:
+                await self.forward_task
+            except asyncio.CancelledError:
+                pass
+        await self.sender.stop()
+        logger.info(f"Telemetry consumer disconnected with code: {close_code}")
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Only stream settings are accepted, nothing reaches the hardware
+        try:
+            message = json.loads(text_data or "")
+        except json.JSONDecodeError:
+            message = {}
+        message_type = message.get("type") if isinstance(message, dict) else None
+
+        if message_type == "set_max_rate":
+            try:
+                self.sender.set_max_rate(message.get("max_rate"))
+                self.sender.send_message({"type": "stream_stats", **self.sender.get_stats()})
+            except ValueError as e:
+                self.sender.send_message({"type": "error", "message": str(e)})
+        elif message_type == "get_stream_stats":
+            self.sender.send_message({"type": "stream_stats", **self.sender.get_stats()})
+        else:
+            self.sender.send_message({
+                "type": "error",
+                "message": "Telemetry endpoint is read-only"
+            })
+
+    async def forward_telemetry(self):
+        """Hand every frame of the subscription to the client's sender"""
+        while True:
+            source, frame = await self.subscription.get()
+            self.sender.send_frame({**frame, "source": source}, key=source)
+
+    async def send_text(self, text):
+        await self.send(text_data=text)
@@ -0,0 +1,49 @@
+# File: chat/telemetryDatabase.py
+# Dedicated database threads for monitor persistence.
+#
+# @sync_to_async runs everything on the one thread-sensitive executor that
+# also serves the sync Django views, so telemetry writes queue behind HTTP
+# requests and the other way round. Each monitor gets its own single-thread
+# executor instead; Django connections are per thread, so every executor
+# also keeps its own database connection open.
+
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_telemetry_executor(name):
+    """Single-thread executor (and thus DB connection) for one writer, e.g. 'motor'"""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"telemetry-db-{name}")
+            _executors[name] = executor
+        return executor
+
+
+def _reset_broken_connection():
+    """Drop the thread's connection after a database error so the next call reconnects"""
+    if connection.connection is not None and connection.errors_occurred and not connection.is_usable():
+        logger.warning("Telemetry database connection unusable, reconnecting")
+        connection.close()
+
+
+def telemetry_db_to_async(name):
+    """Decorator like @sync_to_async that runs on the telemetry DB thread `name`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            _reset_broken_connection()
+            return func(*args, **kwargs)
+        return sync_to_async(run, thread_sensitive=False, executor=get_telemetry_executor(name))
+    return decorator
@@ -0,0 +1,84 @@
+# File: chat/telemetryHub.py
+# In-process fan-out of telemetry frames produced by the monitors
+
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_SOURCES = ("motor", "sensor")
+
+
+class TelemetrySubscription:
+    """Bounded per-subscriber queue of (source, frame); the oldest frames are dropped when full"""
+
+    def __init__(self, hub, sources, maxlen=64):
+        self.hub = hub
+        self.sources = set(sources)
+        self.frames = deque(maxlen=maxlen)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, source, frame):
+        if len(self.frames) == self.frames.maxlen:
+            self.dropped += 1
+        self.frames.append((source, frame))
+        self._ready.set()
+
+    async def get(self):
+        """Wait for and return the next (source, frame)"""
+        while not self.frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self.frames.popleft()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class TelemetryHub:
+    """Keeps the latest frame per source and hands every new frame to the subscribers.
+
+    Publishing never awaits, so a monitor's acquisition loop is not slowed
+    down by how many viewers are attached or how fast they read.
+    """
+
+    def __init__(self):
+        self.latest = {}
+        self.subscriptions = set()
+        self.producers = {}  # source -> running monitor, for in-server consumers like control loops
+
+    def publish(self, source, frame):
+        self.latest[source] = frame
+        for subscription in self.subscriptions:
+            if source in subscription.sources:
+                subscription.push(source, frame)
+
+    def get_latest(self, source):
+        """Most recent frame of a source, or None if nothing was published yet"""
+        return self.latest.get(source)
+
+    def register_producer(self, source, monitor):
+        self.producers[source] = monitor
+
+    def unregister_producer(self, source, monitor):
+        if self.producers.get(source) is monitor:
+            del self.producers[source]
+
+    def get_producer(self, source):
+        """The running monitor of a source, or None"""
+        return self.producers.get(source)
+
+    def subscribe(self, sources=TELEMETRY_SOURCES, maxlen=64):
+        subscription = TelemetrySubscription(self, sources, maxlen)
+        self.subscriptions.add(subscription)
+        logger.info(f"Telemetry subscriber added for {sorted(subscription.sources)} ({len(self.subscriptions)} total)")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+
+# Shared hub for the whole process
+telemetry_hub = TelemetryHub()
@@ -0,0 +1,34 @@
+# File: chat/telemetryJson.py
+# Fast JSON for bulk telemetry responses.
+#
+# Rows are fetched as values_list tuples (no model instances, no serializer
+# fields) and transposed into one list per column, which orjson encodes in C.
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Try to import orjson, fall back to the stdlib encoder if not available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available, encoding telemetry with json")
+
+LAYOUTS = ("rows", "columns")
+
+
+def columnar(queryset, columns, time_column="timestamp", time_key="t"):
+    """{"t": [...], column: [...], ...} of a queryset, in queryset order"""
+    keys = (time_key, *columns)
+    rows = queryset.values_list(time_column, *columns)
+    transposed = list(zip(*rows)) or [()] * len(keys)
+    return {key: list(values) for key, values in zip(keys, transposed)}
+
+
+def dumps(data):
+    """JSON bytes; datetimes become ISO 8601 strings"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
@@ -0,0 +1,210 @@
+# File: chat/telemetryRollups.py
+# 1 s / 10 s / 1 min min-max-mean rollups of the session telemetry.
+#
+# The monitors call update_rollups() in the same transaction as each bulk
+# insert, so the rollups are always as complete as the raw rows. Charts
+# ask query_series() for a time range and a point budget, and get raw
+# rows or the finest rollup that fits the budget. Sessions recorded before
+# rollups existed are backfilled with the backfill_rollups command; until
+# then their charts are downsampled from the raw rows on the fly.
+#
+# A sensor row only holds real values for the nodes whose bit is set in
+# SensorData.nodes; the other columns are model defaults and are left out
+# of the rollups, so every column keeps its own sample count.
+
+import logging
+import math
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import ProtoData, SensorData, TelemetryRollup
+from .sensorcontrol.config import SensorMonitorConfig
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_RESOLUTIONS = (1, 10, 60)  # seconds, finest first
+
+# Numeric columns that are rolled up; touch bitmasks have no meaningful mean
+ROLLUP_COLUMNS = {
+    "motor": ("actual_position", "actual_velocity", "phase_current", "voltage_logic"),
+    "sensor": ("gewicht_A2", "griffhoehe_A2", "gewicht_A3", "griffhoehe_A3"),
+}
+RAW_MODELS = {"motor": ProtoData, "sensor": SensorData}
+
+# Column -> SensorData.nodes bit that must be set for the column to hold a reading
+NODE_BITS = {"motor": None, "sensor": SensorMonitorConfig.get_key_node_bits()}
+
+
+def raw_fields(source):
+    """Fields aggregate() reads from the raw rows of a source"""
+    return ("timestamp", *ROLLUP_COLUMNS[source], *(("nodes",) if NODE_BITS[source] else ()))
+
+
+def bucket_start(epoch, resolution):
+    return datetime.fromtimestamp(epoch - epoch % resolution, tz=timezone.utc)
+
+
+def aggregate(rows, columns, resolutions=ROLLUP_RESOLUTIONS, node_bits=None):
+    """{(resolution, bucket_start): [count, {column: [min, max, sum, samples]}]} of model instances
+
+    With node_bits ({column: bit}), a column only counts in rows whose nodes field has its bit set.
+    """
+    buckets = {}
+    for row in rows:
+        epoch = row.timestamp.timestamp()
+        if node_bits:
+            values = [(column, getattr(row, column)) for column in columns if row.nodes & node_bits[column]]
+        else:
+            values = [(column, getattr(row, column)) for column in columns]
+        for resolution in resolutions:
+            key = (resolution, bucket_start(epoch, resolution))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [0, {}]
+            bucket[0] += 1
+            stats = bucket[1]
+            for column, value in values:
+                column_stats = stats.get(column)
+                if column_stats is None:
+                    stats[column] = [value, value, value, 1]
+                    continue
+                if value < column_stats[0]:
+                    column_stats[0] = value
+                if value > column_stats[1]:
+                    column_stats[1] = value
+                column_stats[2] += value
+                column_stats[3] += 1
+    return buckets
+
+
+def merge_stats(target, other, count):
+    """Fold other's stats into target, a stored bucket of count rows"""
+    for current in target.values():
+        if len(current) == 3:  # stored before per-column sample counts: every row counted
+            current.append(count)
+    for column, (low, high, total, samples) in other.items():
+        current = target.get(column)
+        if current is None:
+            target[column] = [low, high, total, samples]
+        else:
+            target[column] = [min(current[0], low), max(current[1], high), current[2] + total, current[3] + samples]
+
+
+def update_rollups(session_id, source, rows):
+    """Fold freshly inserted rows into the rollups; call inside the insert's transaction"""
+    buckets = aggregate(rows, ROLLUP_COLUMNS[source], node_bits=NODE_BITS[source])
+    if not buckets:
+        return 0
+
+    existing = TelemetryRollup.objects.filter(
+        session_id=session_id, source=source,
+        resolution__in=ROLLUP_RESOLUTIONS, bucket_start__in={start for _, start in buckets},
+    )
+    updated = []
+    for rollup in existing:
+        bucket = buckets.pop((rollup.resolution, rollup.bucket_start), None)
+        if bucket is None:
+            continue
+        merge_stats(rollup.stats, bucket[1], rollup.count)
+        rollup.count += bucket[0]
+        updated.append(rollup)
+
+    if updated:
+        TelemetryRollup.objects.bulk_update(updated, ["count", "stats"])
+    TelemetryRollup.objects.bulk_create([
+        TelemetryRollup(session_id=session_id, source=source, resolution=resolution,
+                        bucket_start=start, count=count, stats=stats)
+        for (resolution, start), (count, stats) in buckets.items()
+    ])
+    return len(updated) + len(buckets)
+
+
+def rebuild_rollups(session_id, source, chunk_size=5000):
+    """Recompute the rollups of a session recorded before rollups existed
+
+    Only for sessions that have ended: the delete and rebuild would race the
+    monitors' update_rollups() on a session that is still recording.
+    """
+    rows = RAW_MODELS[source].objects.filter(session_id=session_id).only(*raw_fields(source))
+    with transaction.atomic():
+        TelemetryRollup.objects.filter(session_id=session_id, source=source).delete()
+        chunk = []
+        for row in rows.order_by("timestamp").iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                update_rollups(session_id, source, chunk)
+                chunk = []
+        if chunk:
+            update_rollups(session_id, source, chunk)
+    logger.info(f"Rebuilt {source} rollups of session {session_id}")
+
+
+def choose_resolution(session_id, source, start, end, max_points):
+    """(resolution, stored): resolution None for raw rows, else the finest one with at most max_points
+    buckets in the range; stored is False when the session has no rollups to read them from"""
+    coarsest = ROLLUP_RESOLUTIONS[-1]
+    raw_count = TelemetryRollup.objects.filter(
+        session_id=session_id, source=source, resolution=coarsest,
+        bucket_start__gte=bucket_start(start.timestamp(), coarsest), bucket_start__lt=end,
+    ).aggregate(total=Sum("count"))["total"]
+    if raw_count is None:
+        # No rollups: an older session, or nothing recorded in the range
+        raw_count = RAW_MODELS[source].objects.filter(
+            session_id=session_id, timestamp__gte=start, timestamp__lt=end).count()
+        if raw_count <= max_points:
+            return None, False
+        stored = False
+    elif raw_count <= max_points:
+        return None, True
+    else:
+        stored = True
+
+    duration = (end - start).total_seconds()
+    for resolution in ROLLUP_RESOLUTIONS:
+        if math.ceil(duration / resolution) <= max_points:
+            return resolution, stored
+    return coarsest, stored
+
+
+def downsample(session_id, source, start, end, resolution):
+    """(bucket_start, count, stats) of raw rows in the range, for sessions without stored rollups"""
+    rows = RAW_MODELS[source].objects.filter(
+        session_id=session_id, timestamp__gte=start, timestamp__lt=end,
+    ).only(*raw_fields(source)).order_by("timestamp").iterator(chunk_size=5000)
+    buckets = aggregate(rows, ROLLUP_COLUMNS[source], resolutions=(resolution,), node_bits=NODE_BITS[source])
+    return [(start_time, count, stats) for (_, start_time), (count, stats) in sorted(buckets.items())]
+
+
+def query_series(session_id, source, columns, start, end, max_points):
+    """(resolution, rows) for a chart; resolution None means raw rows"""
+    resolution, stored = choose_resolution(session_id, source, start, end, max_points)
+    if resolution is None:
+        rows = RAW_MODELS[source].objects.filter(
+            session_id=session_id, timestamp__gte=start, timestamp__lt=end,
+        ).order_by("timestamp").values("timestamp", *columns)
+        return None, list(rows)
+
+    if stored:
+        rollups = TelemetryRollup.objects.filter(
+            session_id=session_id, source=source, resolution=resolution,
+            bucket_start__gte=bucket_start(start.timestamp(), resolution), bucket_start__lt=end,
+        ).order_by("bucket_start").values_list("bucket_start", "count", "stats")
+    else:
+        rollups = downsample(session_id, source, start, end, resolution)
+
+    rows = []
+    for start_time, count, stats in rollups:
+        row = {"timestamp": start_time, "count": count}
+        for column in columns:
+            column_stats = stats.get(column)
+            if column_stats is None:  # the node delivered nothing in this bucket
+                row[column] = row[f"{column}_min"] = row[f"{column}_max"] = None
+                continue
+            low, high, total = column_stats[:3]
+            row[column] = total / (column_stats[3] if len(column_stats) > 3 else count)
+            row[f"{column}_min"] = low
+            row[f"{column}_max"] = high
+        rows.append(row)
+    return resolution, rows
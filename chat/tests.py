@@ -1,3 +1,92 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import BaseUser, ProtoSession, SensorData
+from .sessionAnalytics import compute_metrics
+from .telemetryRollups import query_series, update_rollups
+
+
+class GetUserTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_users(self, count, start=0, **fields):
+        BaseUser.objects.bulk_create([BaseUser(username=f"user{i:04}", **fields) for i in range(start, start + count)])
+
+    def test_query_count_does_not_grow_with_users(self):
+        self.create_users(5)
+        with self.assertNumQueries(1):
+            self.client.get("/get_users")
+
+        self.create_users(200, start=5, geschlecht="FRAU")
+        with self.assertNumQueries(1):
+            response = self.client.get("/get_users")
+        with self.assertNumQueries(1):
+            self.client.get(response.data["next"])
+        with self.assertNumQueries(1):
+            self.client.get("/get_users", {"search": "user01", "geschlecht": "FRAU", "fields": "id,username"})
+
+    def test_cursor_pagination_visits_every_user_once(self):
+        self.create_users(120)
+        usernames = []
+        url = "/get_users?page_size=50"
+        while url:
+            response = self.client.get(url)
+            usernames += [user["username"] for user in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(usernames, sorted(BaseUser.objects.values_list("username", flat=True)))
+
+    def test_search_filters_and_fields(self):
+        self.create_users(3, rollstuhl=True)
+        BaseUser.objects.create(username="anna", rollstuhl=False, height=170.0)
+
+        response = self.client.get("/get_users", {"search": "ann", "fields": "username,height"})
+        self.assertEqual(response.data["results"], [{"username": "anna", "height": 170.0}])
+
+        response = self.client.get("/get_users", {"rollstuhl": "true", "fields": "username"})
+        self.assertEqual(len(response.data["results"]), 3)
+
+        self.assertEqual(self.client.get("/get_users", {"fields": "password"}).status_code, 400)
+        self.assertEqual(self.client.get("/get_users", {"rollstuhl": "maybe"}).status_code, 400)
+
+
+class MissingSensorNodeTests(TestCase):
+    """Values of a node that didn't deliver are model defaults (0.0) and must not count as readings"""
+
+    A2, A3 = 1 << 2, 1 << 3
+
+    def setUp(self):
+        user = BaseUser.objects.create(username="sensor")
+        self.start = timezone.now() - timedelta(minutes=1)
+        self.session = ProtoSession.objects.create(user=user, is_active=False, start_time=self.start,
+                                                   end_time=self.start + timedelta(seconds=10))
+        # A3's load cell reads negative; in the second half A3 is missing and its columns stay 0.0
+        self.rows = [
+            SensorData(session=self.session, timestamp=self.start + timedelta(seconds=i * 0.5),
+                       gewicht_A2=10.0 + i, **({"gewicht_A3": -5.0 - i, "nodes": self.A2 | self.A3}
+                                               if i < 5 else {"nodes": self.A2}))
+            for i in range(10)
+        ]
+        SensorData.objects.bulk_create(self.rows)
+
+    def test_session_metrics_ignore_missing_node(self):
+        metrics = compute_metrics([self.session])[self.session.id]
+        self.assertEqual(metrics["peak_force_A3"], -5.0)
+        self.assertEqual(metrics["peak_force_A2"], 19.0)
+        self.assertEqual(metrics["sensor_samples"], 10)
 
-# Create your tests here.
+    def test_rollups_ignore_missing_node(self):
+        update_rollups(self.session.id, "sensor", self.rows)
+        end = self.start + timedelta(seconds=10)
+        resolution, rows = query_series(self.session.id, "sensor", ("gewicht_A2", "gewicht_A3"), self.start, end, 1)
+        self.assertIsNotNone(resolution)
+        self.assertEqual(sum(row["count"] for row in rows), 10)
+        a3 = [row for row in rows if row["gewicht_A3"] is not None]
+        self.assertEqual(max(row["gewicht_A3_max"] for row in a3), -5.0)
+        self.assertEqual(min(row["gewicht_A3_min"] for row in a3), -9.0)
+        # Means over the delivered samples only
+        self.assertTrue(all(-9.0 <= row["gewicht_A3"] <= -5.0 for row in a3))
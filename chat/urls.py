@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import HomeView, motor, sensor, userkeys, token_default, create_proto_data, createuser,UpdateUserView, Get_User,GetUserView,GetActiveSessionView,DeleteUserView, StartSessionView, StopSessionView, MotorDataView,GetSessionView, GetSessionDataView, current_datetime, StartSensorSessionView, StopSensorSessionView, GetActiveSensorSessionView, GetSensorSessionView, GetSensorSessionDataView
+from .views import HomeView, motor, sensor, userkeys, token_default, create_proto_data, createuser,UpdateUserView, Get_User,GetUserView,GetActiveSessionView,DeleteUserView, StartSessionView, StopSessionView, MotorDataView,GetSessionView, GetSessionDataView, GetSessionSeriesView, GetSessionMetricsView, GetCohortMetricsView, current_datetime, StartSensorSessionView, StopSensorSessionView, GetActiveSensorSessionView, GetSensorSessionView, GetSensorSessionDataView, GetTouchEventsView, CreateExportView, GetExportJobView, DownloadExportView
 
 urlpatterns = [
     path("motor", motor),
@@ -25,6 +25,9 @@ urlpatterns = [
 
     path("motordataview", MotorDataView.as_view()),
     path('get_session_data/<int:session_id>/', GetSessionDataView.as_view(), name='get_session_data'),
+    path('get_session_series/<int:session_id>/', GetSessionSeriesView.as_view(), name='get_session_series'),
+    path("get_session_metrics", GetSessionMetricsView.as_view(), name='get_session_metrics'),
+    path("cohort_metrics", GetCohortMetricsView.as_view(), name='cohort_metrics'),
     
     # Sensor session management
     path("start_sensor_session", StartSensorSessionView.as_view()),
@@ -32,6 +35,13 @@ urlpatterns = [
     path("get_sensor_session", GetSensorSessionView.as_view()),
     path("get_active_sensor_session", GetActiveSensorSessionView.as_view()),
     path('get_sensor_session_data/<int:session_id>/', GetSensorSessionDataView.as_view(), name='get_sensor_session_data'),
+    path('get_touch_events/<int:session_id>/', GetTouchEventsView.as_view(), name='get_touch_events'),
+
+    # Exports (CSV/Parquet zip, written in the background)
+    path("export_sessions", CreateExportView.as_view(), name='export_sessions'),
+    path('export_job/<int:job_id>/', GetExportJobView.as_view(), name='export_job'),
+    path('export_job/<int:job_id>/download/', DownloadExportView.as_view(), name='download_export'),
+
     path('update_user', UpdateUserView.as_view(), name='update_user'),
     path('delete_user', DeleteUserView.as_view(), name='delete_user'),
     
@@ -5,15 +5,28 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.decorators import authentication_classes
-from .serialziers import SessionSerializer, UserSerializer, ProtoDataSerializer
-from .models import ProtoData, BaseUser, ProtoSession, SensorData
+from .serialziers import SessionSerializer, UserSerializer
+from .models import ProtoData, BaseUser, ProtoSession, SensorData, TouchEvent, ExportJob
+from .sensorcontrol.config import SensorMonitorConfig
+from .acquisitionSupervisor import bind_recording_session, unbind_recording_session
+from .partitioning import session_window
+from .telemetryRollups import ROLLUP_COLUMNS, query_series
+from .sessionDataCache import session_data_response
+from .telemetryJson import LAYOUTS, columnar, dumps
+from .exportJobs import EXPORT_SOURCES, PYARROW_AVAILABLE, get_export_worker
+from .sessionAnalytics import session_metrics, summarize_sessions
+from .cohortAnalytics import GROUPINGS, cohort_metrics, parse_user_filters
+from .activeSessions import get_active_session
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from .cachedAuthentication import CachedJWTAuthentication
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import datetime
 
 
@@ -120,19 +133,42 @@ def create_proto_data(request):
 import logging
 logger = logging.getLogger(__name__)
     
+class UserCursorPagination(CursorPagination):
+    # username is unique, so the cursor position is unambiguous
+    ordering = "username"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
 class Get_User(APIView):
+    """User list, one page per request: ?search=ann&rollstuhl=true&fields=id,username&cursor=..."""
     permission_classes = [AllowAny]
 
     def get(self, request):
-        logger.info("Get_User endpoint called")
+        logger.debug("Get_User endpoint called")
         try:
-            users = BaseUser.objects.all()
-            logger.info(f"Retrieved {users.count()} users")
-            serializer = UserSerializer(users, many=True)
-            return Response(serializer.data)
-        except Exception as e:
-            logger.error(f"Error in Get_User: {str(e)}")
-            return Response({"error": str(e)}, status=500)
+            filters = parse_user_filters(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        users = BaseUser.objects.filter(**filters)
+        search = request.query_params.get("search")
+        if search:
+            users = users.filter(username__icontains=search)
+
+        # Sparse fieldsets: only the requested columns are selected and serialized
+        fields = None
+        if request.query_params.get("fields"):
+            fields = request.query_params["fields"].split(",")
+            unknown = [name for name in fields if name not in UserSerializer.Meta.fields]
+            if unknown:
+                return Response({"error": f"Unknown fields {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+            users = users.only("username", *fields)
+
+        paginator = UserCursorPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        serializer = UserSerializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
         
         #session = motorsession.objects.filter(user=request.user, is_active=True).first()
        # if not session:
@@ -145,21 +181,18 @@ class Get_User(APIView):
 
 
 class StartSessionView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        
-        session = ProtoSession.objects.filter(user=request.user, is_active=True).first()
-        if not session:
-            session = ProtoSession.objects.create(user=request.user)
-            return Response({"session_id": session.id}, status=status.HTTP_201_CREATED)
-        else:
-            session = ProtoSession.objects.create(user=request.user)
-            return Response({"session_id": session.id,"message": "closed old session(s)"}, status=status.HTTP_201_CREATED)
+        session, closed_old = ProtoSession.objects.start(request.user)
+        bind_recording_session(session.id)
+        if closed_old:
+            return Response({"session_id": session.id, "message": "closed old session(s)"}, status=status.HTTP_201_CREATED)
+        return Response({"session_id": session.id}, status=status.HTTP_201_CREATED)
         
 class StopSessionView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, session_id):
@@ -167,12 +200,15 @@ class StopSessionView(APIView):
         if not session:
             return Response({"error": "Session not found or already ended"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Write out and detach the recording before the session is closed
+        unbind_recording_session(session.id)
         session.end_session()
+        summarize_sessions([session])
         return Response({"message": "Session ended"}, status=status.HTTP_200_OK)
 
 class GetUserView(APIView):
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
@@ -183,11 +219,11 @@ class GetUserView(APIView):
 
 class GetActiveSessionView(APIView):
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        session = ProtoSession.objects.filter(user=request.user, is_active=True).first()
+        session = get_active_session(request.user.id)
         serializer = SessionSerializer(session)
         if session:
             return Response(serializer.data)
@@ -196,7 +232,7 @@ class GetActiveSessionView(APIView):
 
 class GetSessionView(APIView):
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
@@ -207,7 +243,7 @@ class GetSessionView(APIView):
 
 
 class MotorDataView(APIView):  #creates ProtoData
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, session_id):
@@ -224,7 +260,7 @@ class MotorDataView(APIView):  #creates ProtoData
 
 class GetSessionDataView(APIView):
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request, session_id):
@@ -232,15 +268,84 @@ class GetSessionDataView(APIView):
         if not session:
             return Response({"error": "Invalid session"}, status=status.HTTP_400_BAD_REQUEST)
         
-        data = ProtoData.objects.filter(session=session)
-        serializer = ProtoDataSerializer(data, many=True)
-        return Response(serializer.data)
+        # ?layout=columns returns {"t": [...], "actual_position": [...], ...} instead of one object per row
+        layout = request.query_params.get("layout", "rows")
+        if layout not in LAYOUTS:
+            return Response({"error": f"layout must be one of {', '.join(LAYOUTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            # The time window lets PostgreSQL skip the partitions of other months
+            data = ProtoData.objects.filter(session=session, **session_window(session)).order_by("timestamp")
+            columns = ["actual_position", "actual_velocity", "phase_current", "voltage_logic"]
+            if layout == "columns":
+                return dumps(columnar(data, columns))
+            return dumps(list(data.values(*columns, "timestamp")))
+
+        return session_data_response(request, session, f"motor:{layout}", build)
     
 
 
+class GetSessionSeriesView(APIView):
+    """Chart data of a session: raw rows, or min/max/mean rollups when the range holds more than max_points rows"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_POINTS_DEFAULT = 2000
+    MAX_POINTS_LIMIT = 20000
+
+    def get(self, request, session_id):
+        session = ProtoSession.objects.filter(id=session_id, user=request.user).first()
+        if not session:
+            return Response({"error": "Invalid session"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ?source=sensor&columns=gewicht_A2,gewicht_A3&start=...&end=...&max_points=1000
+        source = request.query_params.get("source", "motor")
+        if source not in ROLLUP_COLUMNS:
+            return Response({"error": f"Unknown source {source}"}, status=status.HTTP_400_BAD_REQUEST)
+        columns = ROLLUP_COLUMNS[source]
+        if request.query_params.get("columns"):
+            columns = tuple(request.query_params["columns"].split(","))
+            unknown = [column for column in columns if column not in ROLLUP_COLUMNS[source]]
+            if unknown:
+                return Response({"error": f"Unknown columns {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            max_points = int(request.query_params.get("max_points", self.MAX_POINTS_DEFAULT))
+        except ValueError:
+            return Response({"error": "max_points must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        max_points = min(max(max_points, 1), self.MAX_POINTS_LIMIT)
+
+        # Buffered rows may be written shortly after the session was stopped
+        start = session.start_time
+        end = (session.end_time or timezone.now()) + datetime.timedelta(seconds=5)
+        for name in ("start", "end"):
+            value = request.query_params.get(name)
+            if value:
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    return Response({"error": f"{name} must be an ISO 8601 datetime"}, status=status.HTTP_400_BAD_REQUEST)
+                if timezone.is_naive(parsed):
+                    parsed = timezone.make_aware(parsed)
+                if name == "start":
+                    start = parsed
+                else:
+                    end = parsed
+        if end <= start:
+            return Response({"error": "end must be after start"}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            resolution, rows = query_series(session.id, source, columns, start, end, max_points)
+            return {"source": source, "resolution": resolution, "columns": columns, "rows": rows}
+
+        fmt = f"series:{source}:{','.join(columns)}:{start.timestamp()}:{end.timestamp()}:{max_points}"
+        return session_data_response(request, session, fmt, build)
+
+
+
 class UpdateUserView(APIView):
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
 
@@ -265,7 +370,7 @@ class UpdateUserView(APIView):
 
 class DeleteUserView(APIView):
     
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def delete(self, request):
@@ -276,21 +381,19 @@ class DeleteUserView(APIView):
 
 # Sensor Session Management Views
 class StartSensorSessionView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        session = ProtoSession.objects.filter(user=request.user, is_active=True).first()
-        if not session:
-            session = ProtoSession.objects.create(user=request.user)
-            return Response({"session_id": session.id}, status=status.HTTP_201_CREATED)
-        else:
-            session = ProtoSession.objects.create(user=request.user)
+        session, closed_old = ProtoSession.objects.start(request.user)
+        bind_recording_session(session.id)
+        if closed_old:
             return Response({"session_id": session.id, "message": "closed old session(s)"}, status=status.HTTP_201_CREATED)
+        return Response({"session_id": session.id}, status=status.HTTP_201_CREATED)
 
 
 class StopSensorSessionView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, session_id):
@@ -298,16 +401,19 @@ class StopSensorSessionView(APIView):
         if not session:
             return Response({"error": "Sensor session not found or already ended"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Write out and detach the recording before the session is closed
+        unbind_recording_session(session.id)
         session.end_session()
+        summarize_sessions([session])
         return Response({"message": "Sensor session ended"}, status=status.HTTP_200_OK)
 
 
 class GetActiveSensorSessionView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        session = ProtoSession.objects.filter(user=request.user, is_active=True).first()
+        session = get_active_session(request.user.id)
         if session:
             return Response({
                 "session_id": session.id,
@@ -319,7 +425,7 @@ class GetActiveSensorSessionView(APIView):
 
 
 class GetSensorSessionView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
@@ -334,7 +440,7 @@ class GetSensorSessionView(APIView):
 
 
 class GetSensorSessionDataView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request, session_id):
@@ -342,18 +448,175 @@ class GetSensorSessionDataView(APIView):
         if not session:
             return Response({"error": "Invalid sensor session"}, status=status.HTTP_400_BAD_REQUEST)
         
-        data = SensorData.objects.filter(session=session)
-        sensor_data = [{
-            "id": item.id,
-            "acc_x": item.acc_x,
-            "acc_y": item.acc_y,
-            "acc_z": item.acc_z,
-            "pitch": item.pitch,
-            "roll": item.roll,
-            "gewicht_N": item.gewicht_N,
-            "touch_status": item.touch_status,
-            "griffhoehe": item.griffhoehe,
-            "sensor_id": item.sensor_id,
-            "time": item.time
-        } for item in data]
-        return Response(sensor_data)
\ No newline at end of file
+        layout = request.query_params.get("layout", "rows")
+        if layout not in LAYOUTS:
+            return Response({"error": f"layout must be one of {', '.join(LAYOUTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            data = SensorData.objects.filter(session=session, **session_window(session)).order_by("timestamp")
+            columns = [
+                "nodes",
+                "gewicht_A2", "touchstatus_A2", "griffhoehe_A2",
+                "gewicht_A3", "touchstatus_A3", "griffhoehe_A3",
+            ]
+            if layout == "columns":
+                return dumps(columnar(data, columns))
+            return dumps(list(data.values("id", "timestamp", *columns)))
+
+        return session_data_response(request, session, f"sensor:{layout}", build)
+
+
+class GetTouchEventsView(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, session_id):
+        session = ProtoSession.objects.filter(id=session_id, user=request.user).first()
+        if not session:
+            return Response({"error": "Invalid sensor session"}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = TouchEvent.objects.filter(session=session)
+
+        # Optional filters: ?node=A2&electrode=5
+        node_name = request.query_params.get("node")
+        if node_name:
+            node = SensorMonitorConfig.get_node_config(node_name)
+            if not node:
+                return Response({"error": f"Unknown node {node_name}"}, status=status.HTTP_400_BAD_REQUEST)
+            events = events.filter(node=node.node_id)
+        electrode = request.query_params.get("electrode")
+        if electrode is not None:
+            try:
+                events = events.filter(electrode=int(electrode))
+            except ValueError:
+                return Response({"error": "electrode must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        touch_events = []
+        for node_id, electrode, start, end in events.order_by("start").values_list("node", "electrode", "start", "end"):
+            node = SensorMonitorConfig.get_node_config_by_id(node_id)
+            touch_events.append({
+                "node": node.name if node else node_id,
+                "electrode": electrode,
+                "start": start,
+                "end": end,
+                "duration": (end - start).total_seconds()
+            })
+        return Response(touch_events)
+
+
+
+class GetSessionMetricsView(APIView):
+    """Peak force per hand, range of motion, mean velocity and duration of each of the user's sessions"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Optional ?sessions=12,13 to compare only some sessions
+        session_ids = None
+        if request.query_params.get("sessions"):
+            try:
+                session_ids = [int(session_id) for session_id in request.query_params["sessions"].split(",")]
+            except ValueError:
+                return Response({"error": "sessions must be a comma separated list of session ids"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(session_metrics(request.user, session_ids))
+
+
+class GetCohortMetricsView(APIView):
+    """Session metrics aggregated over all users matching anthropometric filters"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # e.g. ?rollstuhl=true&age_min=60&group_by=geschlecht
+        try:
+            filters = parse_user_filters(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        group_by = request.query_params.get("group_by")
+        if group_by and group_by not in GROUPINGS:
+            return Response({"error": f"group_by must be one of {', '.join(GROUPINGS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"group_by": group_by, "groups": cohort_metrics(filters, group_by)})
+
+def export_job_data(job):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "format": job.format,
+        "sessions": job.session_ids,
+        "sources": job.sources,
+        "rows": job.rows,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "error": job.error,
+    }
+
+
+class CreateExportView(APIView):
+    """Queues an export of sessions; poll export_job/<id>/ and fetch the zip from its download URL"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # {"sessions": [12, 13], "format": "csv" | "parquet", "sources": ["motor", "sensor"]}
+        session_ids = request.data.get("sessions")
+        if not isinstance(session_ids, list) or not session_ids:
+            return Response({"error": "sessions must be a non-empty list of session ids"}, status=status.HTTP_400_BAD_REQUEST)
+        # bool is an int subclass: true would otherwise export session 1
+        if any(isinstance(session_id, (bool, float)) for session_id in session_ids):
+            return Response({"error": "sessions must be a non-empty list of session ids"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session_ids = sorted({int(session_id) for session_id in session_ids})
+        except (TypeError, ValueError):
+            return Response({"error": "sessions must be a non-empty list of session ids"}, status=status.HTTP_400_BAD_REQUEST)
+        owned = set(ProtoSession.objects.filter(id__in=session_ids, user=request.user).values_list("id", flat=True))
+        missing = [session_id for session_id in session_ids if session_id not in owned]
+        if missing:
+            return Response({"error": f"Invalid sessions {missing}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        export_format = request.data.get("format", ExportJob.Format.CSV)
+        if export_format not in ExportJob.Format.values:
+            return Response({"error": f"format must be one of {', '.join(ExportJob.Format.values)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if export_format == ExportJob.Format.PARQUET and not PYARROW_AVAILABLE:
+            return Response({"error": "Parquet export needs pyarrow on the server"}, status=status.HTTP_400_BAD_REQUEST)
+
+        sources = request.data.get("sources", list(EXPORT_SOURCES))
+        if not isinstance(sources, list) or not sources or any(source not in EXPORT_SOURCES for source in sources):
+            return Response({"error": f"sources must be a list of {', '.join(EXPORT_SOURCES)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = ExportJob.objects.create(user=request.user, session_ids=session_ids,
+                                       sources=list(dict.fromkeys(sources)), format=export_format)
+        get_export_worker().submit(job)
+        return Response(export_job_data(job), status=status.HTTP_202_ACCEPTED)
+
+
+class GetExportJobView(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = ExportJob.objects.filter(id=job_id, user=request.user).first()
+        if not job:
+            return Response({"error": "Invalid export job"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(export_job_data(job))
+
+
+class DownloadExportView(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = ExportJob.objects.filter(id=job_id, user=request.user).first()
+        if not job:
+            return Response({"error": "Invalid export job"}, status=status.HTTP_400_BAD_REQUEST)
+        if job.status != ExportJob.Status.DONE:
+            return Response({"error": f"Export is {job.status}"}, status=status.HTTP_409_CONFLICT)
+        try:
+            archive = open(job.file_path, "rb")
+        except OSError:
+            return Response({"error": "Export file is gone, request a new export"}, status=status.HTTP_410_GONE)
+        return FileResponse(archive, as_attachment=True, filename=f"session_export_{job.id}.zip")
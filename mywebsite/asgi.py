@@ -13,12 +13,14 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 import chat.routing
+from chat.acquisitionSupervisor import AcquisitionLifespan
 from .middleware import WebSocketTrafficMiddleware
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mywebsite.settings')
 
 application = ProtocolTypeRouter({
     'http':get_asgi_application(),
+    'lifespan':AcquisitionLifespan(),
     'websocket':AuthMiddlewareStack(
         WebSocketTrafficMiddleware(
              URLRouter(
@@ -1,20 +1,80 @@
 import logging
-import json
+import random
+import time
+
 from channels.middleware import BaseMiddleware
+from django.conf import settings
 
 
 logger = logging.getLogger(__name__)
 
+
+class TrafficStats:
+    """Frame and byte counters per (route, client host, direction), logged as one summary per interval"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.counters = {}  # (path, host, direction) -> [frames, bytes]
+        self.window_start = time.monotonic()
+
+    def count(self, path, host, direction, message):
+        """Count a websocket.receive/websocket.send frame; text is counted as its UTF-8 size"""
+        text = message.get("text")
+        if text is None:
+            size = len(message.get("bytes") or b"")
+        else:
+            # JSON telemetry is ASCII: its length is its size, without encoding a copy per frame
+            size = len(text) if text.isascii() else len(text.encode())
+        counter = self.counters.get((path, host, direction))
+        if counter is None:
+            counter = self.counters[(path, host, direction)] = [0, 0]
+        counter[0] += 1
+        counter[1] += size
+
+        now = time.monotonic()
+        if now - self.window_start >= self.interval:
+            self.flush(now)
+
+    def flush(self, now=None):
+        """Log and reset the counters of the current window"""
+        now = now or time.monotonic()
+        elapsed = max(now - self.window_start, 1e-9)
+        for (path, host, direction), (frames, size) in sorted(self.counters.items()):
+            logger.info(
+                "WebSocket traffic %s %s %s: %d frames (%.1f/s), %d bytes",
+                path, host, direction, frames, frames / elapsed, size,
+                extra={"traffic": {"path": path, "client": host, "direction": direction,
+                                   "frames": frames, "bytes": size, "seconds": round(elapsed, 3)}},
+            )
+        self.counters = {}
+        self.window_start = now
+
+
+traffic_stats = TrafficStats(getattr(settings, "WS_TRAFFIC_LOG_INTERVAL", 60))
+
+
 class WebSocketTrafficMiddleware(BaseMiddleware):
+    """Counts WebSocket traffic per route and client; full payloads are logged for a sample of messages only"""
+
     async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        host = scope["client"][0] if scope.get("client") else "-"
+        sample_rate = getattr(settings, "WS_TRAFFIC_SAMPLE_RATE", 0.0)
+
         async def new_receive():
             message = await receive()
-            logger.info(f"Received from {scope['client']}: {message}")  # Log incoming message
+            if message["type"] != "websocket.receive":
+                return message
+            traffic_stats.count(path, host, "in", message)
+            # Payload logs are DEBUG and lazily formatted: no cost unless sampled and enabled
+            if sample_rate and random.random() < sample_rate and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received from %s on %s: %r", host, path, message)
             return message
 
         async def new_send(message):
-            
+            # accept/close are handshake events, not traffic
+            if message["type"] == "websocket.send":
+                traffic_stats.count(path, host, "out", message)
             await send(message)
 
-        # Use this if you are not decoding message on receive:
-        await super().__call__(scope, new_receive, new_send)
\ No newline at end of file
+        await super().__call__(scope, new_receive, new_send)
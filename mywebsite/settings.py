@@ -61,6 +61,18 @@ CHANNEL_LAYERS = {
     }
 }
 
+# WebSocket traffic (mywebsite/middleware.py): counters are logged every WS_TRAFFIC_LOG_INTERVAL seconds;
+# WS_TRAFFIC_SAMPLE_RATE is the share of inbound messages whose payload is logged at DEBUG level
+WS_TRAFFIC_LOG_INTERVAL = float(os.environ.get('WS_TRAFFIC_LOG_INTERVAL', '60'))
+WS_TRAFFIC_SAMPLE_RATE = float(os.environ.get('WS_TRAFFIC_SAMPLE_RATE', '0'))
+
+# Largest velocity / current setpoint (drive units) that profiles and the admittance loop may command
+MOTOR_MAX_VELOCITY = int(os.environ.get('MOTOR_MAX_VELOCITY', '5000'))
+MOTOR_MAX_CURRENT = int(os.environ.get('MOTOR_MAX_CURRENT', '3000'))
+
+# Start motor/sensor acquisition with the server (ASGI lifespan) instead of with the first consumer
+ACQUISITION_AUTOSTART = os.environ.get('ACQUISITION_AUTOSTART', 'False').lower() in ('1', 'true', 'yes')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -117,6 +129,45 @@ if not os.environ.get('DATABASE_URL'):
 #    }
 #}
 
+# Caches
+# Payloads of finished sessions (chat/sessionDataCache.py) use at most SESSION_DATA_CACHE_BUDGET bytes
+# per process (default 256 MiB); payloads over SESSION_DATA_CACHE_MAX_BYTES are served uncached.
+# Set SESSION_DATA_CACHE_DIR to share them between processes through files; that backend can only
+# count files, so it keeps at most BUDGET // MAX_BYTES of them.
+SESSION_DATA_CACHE_BUDGET = int(os.environ.get('SESSION_DATA_CACHE_BUDGET', 256 * 1024 * 1024))
+SESSION_DATA_CACHE_MAX_BYTES = int(os.environ.get('SESSION_DATA_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'session_data': {
+        'BACKEND': 'chat.sessionDataCache.BoundedLocMemCache',
+        'LOCATION': 'session-data',
+        'OPTIONS': {
+            'MAX_BYTES': SESSION_DATA_CACHE_BUDGET,
+            'MAX_ENTRIES': 1024,  # payloads and per-session key lists; the byte budget is the real bound
+            'CULL_FREQUENCY': 4,  # drop a quarter of the entries when full
+        },
+    },
+}
+if os.environ.get('SESSION_DATA_CACHE_DIR'):
+    CACHES['session_data'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['SESSION_DATA_CACHE_DIR'],
+        'OPTIONS': {
+            'MAX_ENTRIES': max(1, SESSION_DATA_CACHE_BUDGET // SESSION_DATA_CACHE_MAX_BYTES),
+            'CULL_FREQUENCY': 4,
+        },
+    }
+
+# Session exports (chat/exportJobs.py)
+EXPORT_DIR = os.environ.get('EXPORT_DIR', os.path.join(BASE_DIR, 'exports'))
+# A running job whose worker has not sent a heartbeat for this long is taken as dead and failed
+EXPORT_STALE_AFTER = int(os.environ.get('EXPORT_STALE_AFTER', '120'))  # seconds
+# Archives are deleted this long after their job finished
+EXPORT_RETENTION_DAYS = int(os.environ.get('EXPORT_RETENTION_DAYS', '7'))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -191,10 +242,14 @@ CSRF_TRUSTED_ORIGINS = ["http://localhost:3000"]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
 
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # JWT bleibt für andere Routen aktiv
+        'chat.cachedAuthentication.CachedJWTAuthentication',  # JWT bleibt für andere Routen aktiv
     ],
 }
 
+# Validated access tokens and their users (chat/cachedAuthentication.py)
+JWT_USER_CACHE_SIZE = int(os.environ.get('JWT_USER_CACHE_SIZE', '1024'))
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', '300'))  # seconds, at most until the token expires
+
 SIMPLE_JWT = {
      'ACCESS_TOKEN_LIFETIME': timedelta(minutes=120),
      'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -129,11 +129,13 @@ const SessionVisualizer = ({ sessionid, is_active, maxDataPoints = 10000 }) => {
           setData([]);
           return;
         }
-        const response = await axiosInstance.get(`get_session_data/${sessionid}`);
-        if (!Array.isArray(response.data)) throw new Error("Invalid data format");
-        
-        // Limit initial data points
-        const limitedData = response.data.slice(-maxDataPoints);
+        // The server downsamples long sessions to min/max/mean buckets of at most maxDataPoints
+        const response = await axiosInstance.get(`get_session_series/${sessionid}/`, {
+          params: { source: "motor", max_points: maxDataPoints },
+        });
+        if (!Array.isArray(response.data.rows)) throw new Error("Invalid data format");
+
+        const limitedData = response.data.rows;
         setData(limitedData);
         console.log("Data Fetched:", limitedData);
         dataInitializedRef.current = true;
@@ -274,8 +276,8 @@ const SessionVisualizer = ({ sessionid, is_active, maxDataPoints = 10000 }) => {
     };
   }, []);
 
-  // WebSocket for real-time data
-  useWebSocket('ws://' + window.location.hostname + ':8000/ws/motor_control/', {
+  // Read-only telemetry stream for real-time data (does not touch the motor)
+  useWebSocket('ws://' + window.location.hostname + ':8000/ws/telemetry/?sources=motor', {
     onOpen: () => console.log('WS Open'),
     shouldReconnect: () => true,
     share: true,
@@ -11,8 +11,15 @@ const GetUsers = () => {
     useEffect(() => {
         const fetchdata = async () => {
             try {
-                const userdata = await axiosInstanceWithoutAuth.get("/get_users");
-                setUserData(userdata.data);
+                // The list is paginated; only the usernames are needed for the buttons
+                let users = [];
+                let url = "/get_users?fields=username&page_size=500";
+                while (url) {
+                    const userdata = await axiosInstanceWithoutAuth.get(url);
+                    users = users.concat(userdata.data.results);
+                    url = userdata.data.next;
+                }
+                setUserData(users);
             } catch (error) {
                 console.error("Error fetching users:", error);
             }